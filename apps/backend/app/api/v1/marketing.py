@@ -1,17 +1,28 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, HttpUrl
-from typing import List
-import httpx, asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+import asyncio
+import hashlib
+import json
 
-from app.services.marketing_qa.utm_validator import validate_utm
-from app.services.marketing_qa.pixel_checker import check_pixels
-from app.services.marketing_qa.copy_bias_scan import scan_copy
-from app.services.marketing_qa.trust_score import compute_score
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.services.marketing_qa.fetcher import PageFetcher, normalize_url
+from app.services.marketing_qa.utm_validator import validate_utm_batch, normalize_tracking_url
+from app.services.marketing_qa.pixel_checker import check_pixels, vendor_pack_files
+from app.services.marketing_qa.copy_bias_scan import scan_copy, rule_pack_files
+from app.services.marketing_qa.crawl_cache import crawl_cache
+from app.services.marketing_qa.trust_score import TrustScoreAccumulator
+from app.services.marketing_qa import campaign_history
 
 router = APIRouter(prefix="/v1/marketing", tags=["marketing"])
 
 class MarketingQARequest(BaseModel):
     urls: List[HttpUrl]
+    campaign_id: Optional[UUID] = None  # record the run in this campaign's history
 
 class CheckResult(BaseModel):
     check: str
@@ -21,27 +32,199 @@ class CheckResult(BaseModel):
 class MarketingQAResponse(BaseModel):
     trust_score: int
     results: List[CheckResult]
+    iteration: Optional[dict] = None
+
+class CampaignCreate(BaseModel):
+    brand_sankalpa: str
+    consciousness_impact: Optional[str] = None
+
+class UTMAuditRequest(BaseModel):
+    urls: List[str]  # plain strings: 100k links are not worth HttpUrl validation, and bad ones still get reported
+
+class UTMAuditResponse(BaseModel):
+    consistency: CheckResult
+    results: List[CheckResult]
+
+CHECKS_REVISION = "1"  # bump when check_page's checkers change in code; packs are fingerprinted by mtime
+
+def checks_version() -> str:
+    """Identifies what check_page computes; crawl cache entries from another version are not reused"""
+    files = rule_pack_files() + vendor_pack_files()
+    key = CHECKS_REVISION + "".join(f"{f}:{f.stat().st_mtime_ns}" for f in files)
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+def page_fetcher() -> PageFetcher:
+    return PageFetcher(cache=crawl_cache, cache_version=checks_version())
+
+def check_page(url: str, page: dict, version: str | None = None) -> list[dict]:
+    """
+    Every HTML checker for one fetched page; unchanged pages reuse their cached results.
+    CPU-bound plus a cache write: async callers run it with asyncio.to_thread.
+    """
+    if page["error"]:
+        return [{"check": "page_fetch", "status": "fail", "details": {"url": url, "error": page["error"]}}]
+    if page.get("cached_results") is not None:
+        return page["cached_results"]
+    results = [
+        # pixels
+        check_pixels(page["html"]),
+        # copy checkers read visible text only (no scripts/styles/JSON blobs)
+        scan_copy(page["text"]),
+    ]
+    if version is not None:
+        crawl_cache.put(url, version, page, results)
+    return results
+
+class RunTally:
+    """Running score, {url: {check: status}} and copy findings of one run, for campaign history"""
+
+    def __init__(self):
+        self.score = TrustScoreAccumulator()
+        self.state: dict[str, dict] = {}
+        self.findings: dict[str, int] = {}  # copy hint -> pages
+
+    def add(self, url: str, results: list[dict]):
+        self.score.extend(results, url=url)
+        campaign_history.page_state(results, self.state.setdefault(url, {}))
+        for r in results:
+            if r.get("check") == "copy_bias_scan":
+                for hint in r["details"]["findings"]:
+                    self.findings[hint] = self.findings.get(hint, 0) + 1
+
+async def require_campaign(campaign_id: UUID):
+    """Fail before fetching anything when the run cannot be recorded"""
+    if AsyncSessionLocal is None:
+        raise HTTPException(status_code=503, detail="Campaign history is not configured (set DATABASE_URL)")
+    async with AsyncSessionLocal() as db:
+        if not await campaign_history.campaign_exists(db, campaign_id):
+            raise HTTPException(status_code=404, detail="Campaign not found")
+
+async def record_campaign_run(campaign_id: UUID, tally: RunTally) -> dict:
+    async with AsyncSessionLocal() as db:
+        iteration = await campaign_history.record_run(db, campaign_id, tally.state, tally.score, tally.findings)
+        if iteration is None:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+        await db.commit()
+    return iteration
 
 @router.post("/qa/run", response_model=MarketingQAResponse)
 async def run_marketing_qa(req: MarketingQARequest):
+    if req.campaign_id is not None:
+        await require_campaign(req.campaign_id)
     results: list[dict] = []
+    tally = RunTally()
 
-    # UTM checks
-    for u in req.urls:
-        results.append(validate_utm(str(u)))
+    # UTM checks: each distinct link parsed once, plus campaign-wide value consistency
+    urls = [str(u) for u in req.urls]
+    utm = validate_utm_batch(urls)
+    for u in urls:
+        result = utm["results"][normalize_tracking_url(u)]
+        results.append(result)
+        tally.add(normalize_url(u), [result])
+    results.append(utm["consistency"])
+    tally.add(campaign_history.CAMPAIGN_KEY, [utm["consistency"]])
 
-    # Pixel & simple copy scan (fetch once per URL)
-    async with httpx.AsyncClient(timeout=10) as client:
-        htmls = await asyncio.gather(*[client.get(str(u), follow_redirects=True) for u in req.urls])
-    for r in htmls:
-        url = str(r.request.url)
+    # Fetch each distinct page once (bounded globally and per host, conditional when cached),
+    # then hand the HTML to every checker
+    fetcher = page_fetcher()
+    pages = await fetcher.fetch_all(urls)
+    for url, page in pages.items():
+        page_results = await asyncio.to_thread(check_page, url, page, fetcher.cache_version)
+        results.extend(page_results)
+        tally.add(url, page_results)
 
-        # pixels
-        pix = await check_pixels(url)
-        results.append(pix)
+    iteration = await record_campaign_run(req.campaign_id, tally) if req.campaign_id is not None else None
+    return {"trust_score": tally.score.score, "results": results, "iteration": iteration}
+
+@router.post("/campaigns", status_code=201)
+async def create_campaign(body: CampaignCreate, db: AsyncSession = Depends(get_async_db)):
+    row = await campaign_history.create_campaign(db, body.brand_sankalpa, body.consciousness_impact)
+    await db.commit()
+    return dict(row)
+
+@router.get("/campaigns/{campaign_id}/scores")
+async def campaign_scores(campaign_id: UUID, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                          bucket: Optional[str] = None, limit: int = 500, db: AsyncSession = Depends(get_async_db)):
+    """Trust score per recorded run, or avg/min/max per hour|day|week|month with `bucket`; latest `limit` points"""
+    if bucket is not None and bucket not in campaign_history.BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of {', '.join(campaign_history.BUCKETS)}")
+    if not await campaign_history.campaign_exists(db, campaign_id):
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    points = await campaign_history.score_series(db, campaign_id, since, until, bucket, max(1, min(limit, 5000)))
+    return {"campaign_id": str(campaign_id), "bucket": bucket, "points": points}
+
+@router.get("/campaigns/{campaign_id}/iterations/{seq}")
+async def campaign_iteration(campaign_id: UUID, seq: int, db: AsyncSession = Depends(get_async_db)):
+    """Per-URL check statuses as of run `seq`, rebuilt from the nearest keyframe"""
+    found_seq, trust_score, state = await campaign_history.load_state(db, campaign_id, seq)
+    if found_seq != seq:
+        raise HTTPException(status_code=404, detail="Iteration not found")
+    return {"campaign_id": str(campaign_id), "seq": seq, "trust_score": trust_score, "state": state}
+
+@router.post("/utm/audit", response_model=UTMAuditResponse)
+def audit_utm(req: UTMAuditRequest, include_results: bool = False):
+    """
+    UTM audit for a whole campaign's tracked links, no page fetches. Returns
+    the consistency summary; per-link results (one per distinct link) only
+    with include_results=true. Sync on purpose: it is pure CPU, so it runs in
+    the threadpool instead of the event loop.
+    """
+    utm = validate_utm_batch(req.urls)
+    return {"consistency": utm["consistency"],
+            "results": list(utm["results"].values()) if include_results else []}
+
+STREAM_FORMATS = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+def stream_event(fmt: str, name: str, data: dict) -> str:
+    body = json.dumps(data, default=str)
+    return f"event: {name}\ndata: {body}\n\n" if fmt == "sse" else body + "\n"
+
+@router.post("/qa/stream")
+async def stream_marketing_qa(req: MarketingQARequest, format: str = "ndjson"):
+    """
+    Same checks as /qa/run, emitted per URL as soon as its page is scanned:
+    one `result` event {url, results, url_score, trust_score, completed,
+    total} per distinct URL (trust_score is the running score so far), one
+    `consistency` event {results: [utm_consistency], trust_score}, then one
+    `done` event with the per-check breakdown (and the recorded iteration
+    when campaign_id is set). Page bodies are dropped right after scanning.
+    """
+    if format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(STREAM_FORMATS)}")
+    if req.campaign_id is not None:
+        await require_campaign(req.campaign_id)
+
+    inputs: dict[str, list[str]] = {}
+    for u in req.urls:
+        inputs.setdefault(normalize_url(str(u)), []).append(str(u))
+    # one pass over every link, as /qa/run: per-link results plus the campaign-wide consistency check
+    utm = validate_utm_batch([u for links in inputs.values() for u in links])
 
-        # copy (very naive on full HTML; refine to visible text later)
-        results.append(scan_copy(r.text))
+    async def events():
+        tally = RunTally()
+        score = tally.score
+        completed = 0
+        fetcher = page_fetcher()
+        async for page in fetcher.stream(list(inputs)):
+            results = [utm["results"][normalize_tracking_url(u)] for u in inputs[page["url"]]]
+            results += await asyncio.to_thread(check_page, page["url"], page, fetcher.cache_version)
+            page["html"] = page["text"] = None
+            tally.add(page["url"], results)
+            completed += 1
+            yield stream_event(format, "result", {
+                "url": page["url"], "results": results, "url_score": score.url_score(page["url"]),
+                "trust_score": score.score, "completed": completed, "total": len(inputs),
+            })
+        tally.add(campaign_history.CAMPAIGN_KEY, [utm["consistency"]])
+        yield stream_event(format, "consistency", {"results": [utm["consistency"]], "trust_score": score.score})
+        done = {"done": True, "trust_score": score.score, "urls": completed, "checks": score.count,
+                "by_check": score.breakdown()["by_check"]}
+        if req.campaign_id is not None:
+            try:
+                done["iteration"] = await record_campaign_run(req.campaign_id, tally)
+            except HTTPException as e:
+                done["iteration_error"] = e.detail
+        yield stream_event(format, "done", done)
 
-    score = compute_score(results)
-    return {"trust_score": score, "results": results}
+    return StreamingResponse(events(), media_type=STREAM_FORMATS[format],
+                             headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"})
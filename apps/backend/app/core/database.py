@@ -0,0 +1,27 @@
+import os
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+
+def to_async_url(url: str) -> str:
+    """postgresql[+psycopg2]://... -> postgresql+asyncpg://..."""
+    scheme, rest = url.split("://", 1)
+    return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgresql") else url
+
+# Same database as backend/ (its alembic owns the schema). Optional: without a URL the marketing
+# checks still run, only campaign recording and history are unavailable.
+DATABASE_URL = os.getenv("MARKETING_DATABASE_URL") or os.getenv("DATABASE_URL")
+async_engine = create_async_engine(
+    to_async_url(DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "5")),
+) if DATABASE_URL else None
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False) if async_engine else None
+
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise HTTPException(status_code=503, detail="Campaign history is not configured (set DATABASE_URL)")
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,72 @@
+"""
+The crawler's pooled HTTP client.
+
+backend/app/core/http.py has the general multi-upstream registry (in-flight
+metering, saturation stats). This service is a separate image with its own
+`app` package and only ever talks to one pool, the landing-page crawler, so
+it keeps just that: pool settings from env and open/idle connection metrics.
+"""
+import importlib.util
+import logging
+import os
+import httpx
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class CrawlerClient:
+    """
+    One long-lived AsyncClient for every landing-page fetch (keep-alive across
+    URLs and runs), opened and closed with the app. Settings come from
+    HTTP_CRAWLER_MAX_CONNECTIONS, _MAX_KEEPALIVE, _KEEPALIVE_EXPIRY,
+    _CONNECT_TIMEOUT, _TIMEOUT and _HTTP2.
+    """
+
+    def __init__(self, max_connections: int = 50, max_keepalive: int = 20, keepalive_expiry: float = 30.0,
+                 connect_timeout: float = 5.0, timeout: float = 10.0, http2: bool = True):
+        env = "HTTP_CRAWLER_"
+        self.max_connections = int(os.getenv(env + "MAX_CONNECTIONS", max_connections))
+        self.max_keepalive = int(os.getenv(env + "MAX_KEEPALIVE", max_keepalive))
+        self.keepalive_expiry = float(os.getenv(env + "KEEPALIVE_EXPIRY", keepalive_expiry))
+        self.connect_timeout = float(os.getenv(env + "CONNECT_TIMEOUT", connect_timeout))
+        self.timeout = float(os.getenv(env + "TIMEOUT", timeout))
+        self.http2 = os.getenv(env + "HTTP2", "1" if http2 else "0") == "1"
+        self._client = None
+
+    def get(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build()
+        return self._client
+
+    def _build(self) -> httpx.AsyncClient:
+        http2 = self.http2 and HTTP2_AVAILABLE
+        if self.http2 and not http2:
+            logger.warning("HTTP/2 requested for the crawler but h2 is not installed; using HTTP/1.1")
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_keepalive,
+                              keepalive_expiry=self.keepalive_expiry)
+        # http2 only takes effect when the site negotiates it (ALPN), otherwise HTTP/1.1
+        return httpx.AsyncClient(limits=limits, http2=http2,
+                                 timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout))
+
+    async def open(self):
+        self.get()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def metrics(self) -> dict:
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        return {
+            "max_connections": self.max_connections,
+            "http2": self.http2 and HTTP2_AVAILABLE,
+            "connections_open": len(connections),
+            "connections_idle": sum(1 for c in connections if c.is_idle()),
+        }
+
+
+crawler_client = CrawlerClient()
@@ -1,6 +1,11 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.http import crawler_client
+from app.services.marketing_qa.crawl_cache import crawl_cache
+from app.api.v1 import marketing, parliament
+
 app = FastAPI(title="Sacred QA Studio Backend")
 
 app.add_middleware(
@@ -11,6 +16,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.include_router(marketing.router)
+app.include_router(parliament.router)
+
+
+@app.on_event("startup")
+async def open_http_clients():
+    await crawler_client.open()
+
+@app.on_event("startup")
+async def prune_crawl_cache():
+    if crawl_cache.enabled and crawl_cache.directory.exists():
+        await asyncio.to_thread(crawl_cache.prune)
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await crawler_client.aclose()
+
 
 @app.get("/")
 async def root():
@@ -19,3 +41,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "backend"}
+
+@app.get("/metrics")
+async def metrics():
+    return {"http_pools": {"crawler": crawler_client.metrics()}, "crawl_cache": crawl_cache.metrics()}
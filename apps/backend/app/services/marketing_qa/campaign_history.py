@@ -0,0 +1,182 @@
+import json
+import os
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Every recorded run stores only what changed since the previous one ({"set", "removed"});
+# every KEYFRAME_EVERY-th run stores the full {url: {check: status}} snapshot instead, so
+# rebuilding any state reads one keyframe plus at most KEYFRAME_EVERY - 1 deltas.
+KEYFRAME_EVERY = int(os.getenv("CAMPAIGN_KEYFRAME_EVERY", "20"))
+BUCKETS = ("hour", "day", "week", "month")
+CAMPAIGN_KEY = "*"  # campaign-wide checks (utm_consistency) are filed under this pseudo-URL
+_RANK = {"fail": 0, "warning": 1, "pass": 2}
+
+
+def page_state(results: list[dict], state: dict | None = None) -> dict:
+    """{check: status} for one URL's results; repeated checks keep their worst status"""
+    state = {} if state is None else state
+    for r in results:
+        check, status = r.get("check", "unknown"), r.get("status", "fail")
+        if check not in state or _RANK.get(status, 0) < _RANK.get(state[check], 0):
+            state[check] = status
+    return state
+
+
+def diff_state(previous: dict, current: dict) -> dict:
+    """Delta from one run's {url: {check: status}} to the next; a None status drops that check"""
+    changed = {}
+    for url, checks in current.items():
+        before = previous.get(url, {})
+        entry = {c: s for c, s in checks.items() if before.get(c) != s}
+        entry.update({c: None for c in before if c not in checks})
+        if entry:
+            changed[url] = entry
+    return {"set": changed, "removed": [url for url in previous if url not in current]}
+
+
+def apply_delta(state: dict, delta: dict) -> dict:
+    for url in delta["removed"]:
+        state.pop(url, None)
+    for url, checks in delta["set"].items():
+        row = state.setdefault(url, {})
+        for check, status in checks.items():
+            if status is None:
+                row.pop(check, None)
+            else:
+                row[check] = status
+    return state
+
+
+CREATE_CAMPAIGN_QUERY = text("""
+    INSERT INTO app.campaign_lineage (brand_sankalpa, consciousness_impact)
+    VALUES (:brand_sankalpa, :consciousness_impact)
+    RETURNING campaign_id, brand_sankalpa, created_at
+""")
+
+CAMPAIGN_EXISTS_QUERY = text("""
+    SELECT 1 FROM app.campaign_lineage WHERE campaign_id = CAST(:campaign_id AS uuid)
+""")
+
+# Serializes recorders of one campaign (seq is max + 1) and confirms it exists
+LOCK_CAMPAIGN_QUERY = text("""
+    SELECT campaign_id FROM app.campaign_lineage WHERE campaign_id = CAST(:campaign_id AS uuid) FOR UPDATE
+""")
+
+# Latest keyframe and every delta after it (or up to :seq), newest last
+STATE_ROWS_QUERY = text("""
+    SELECT seq, trust_score, snapshot, delta
+    FROM app.campaign_iterations
+    WHERE campaign_id = CAST(:campaign_id AS uuid) AND seq <= :seq
+      AND seq >= COALESCE((SELECT max(seq) FROM app.campaign_iterations
+                           WHERE campaign_id = CAST(:campaign_id AS uuid) AND seq <= :seq
+                             AND snapshot IS NOT NULL), 0)
+    ORDER BY seq
+""")
+
+# Append the run and refresh the campaign's constant-size summary in one round trip
+RECORD_ITERATION_QUERY = text("""
+    WITH iteration AS (
+        INSERT INTO app.campaign_iterations
+        (campaign_id, seq, trust_score, score_delta, urls, checks, by_check, snapshot, delta)
+        VALUES (CAST(:campaign_id AS uuid), :seq, :trust_score, :score_delta, :urls, :checks,
+                CAST(:by_check AS jsonb), CAST(:snapshot AS jsonb), CAST(:delta AS jsonb))
+        RETURNING run_at
+    )
+    UPDATE app.campaign_lineage c SET
+        trust_score_evolution = jsonb_build_object(
+            'runs', CAST(:seq AS int),
+            'latest_score', CAST(:trust_score AS int),
+            'latest_delta', CAST(:score_delta AS int),
+            'first_score', COALESCE(c.trust_score_evolution -> 'first_score', to_jsonb(CAST(:trust_score AS int))),
+            'best_score', GREATEST(COALESCE((c.trust_score_evolution ->> 'best_score')::int, 0),
+                                   CAST(:trust_score AS int)),
+            'last_run_at', (SELECT run_at FROM iteration)
+        ),
+        copy_iterations = jsonb_build_object('latest_seq', CAST(:seq AS int), 'findings', CAST(:findings AS jsonb))
+    FROM iteration
+    WHERE c.campaign_id = CAST(:campaign_id AS uuid)
+    RETURNING iteration.run_at
+""")
+
+
+async def create_campaign(db: AsyncSession, brand_sankalpa: str, consciousness_impact: str | None = None):
+    return (await db.execute(CREATE_CAMPAIGN_QUERY, {
+        "brand_sankalpa": brand_sankalpa, "consciousness_impact": consciousness_impact,
+    })).mappings().one()
+
+
+async def campaign_exists(db: AsyncSession, campaign_id: str) -> bool:
+    return (await db.execute(CAMPAIGN_EXISTS_QUERY, {"campaign_id": str(campaign_id)})).first() is not None
+
+
+async def load_state(db: AsyncSession, campaign_id: str, seq: int = 2**31 - 1) -> tuple[int, int | None, dict]:
+    """(seq, trust_score, {url: {check: status}}) as of iteration `seq` (latest by default); (0, None, {}) if none"""
+    rows = (await db.execute(STATE_ROWS_QUERY, {"campaign_id": str(campaign_id), "seq": seq})).mappings().all()
+    state, last = {}, None
+    for row in rows:
+        state = dict(row["snapshot"]) if row["snapshot"] is not None else apply_delta(state, row["delta"])
+        last = row
+    return (last["seq"], last["trust_score"], state) if last else (0, None, {})
+
+
+async def record_run(db: AsyncSession, campaign_id: str, state: dict, score, findings: dict | None = None) -> dict | None:
+    """
+    Append one run: `state` is {url: {check: status}}, `score` its TrustScoreAccumulator,
+    `findings` {copy hint: pages}. Returns None when the campaign does not exist. Caller commits.
+    """
+    if (await db.execute(LOCK_CAMPAIGN_QUERY, {"campaign_id": str(campaign_id)})).first() is None:
+        return None
+    previous_seq, previous_score, previous = await load_state(db, campaign_id)
+    seq = previous_seq + 1
+    keyframe = seq == 1 or (seq - 1) % KEYFRAME_EVERY == 0
+    delta = None if keyframe else diff_state(previous, state)
+    score_delta = None if previous_score is None else score.score - previous_score
+    row = (await db.execute(RECORD_ITERATION_QUERY, {
+        "campaign_id": str(campaign_id),
+        "seq": seq,
+        "trust_score": score.score,
+        "score_delta": score_delta,
+        "urls": len([url for url in state if url != CAMPAIGN_KEY]),
+        "checks": score.count,
+        "by_check": json.dumps(score.breakdown()["by_check"]),
+        "snapshot": json.dumps(state) if keyframe else None,
+        "delta": json.dumps(delta) if delta is not None else None,
+        "findings": json.dumps(findings or {}),
+    })).first()
+    return {
+        "campaign_id": str(campaign_id), "seq": seq, "run_at": row.run_at, "trust_score": score.score,
+        "score_delta": score_delta, "keyframe": keyframe,
+        "changed_urls": len(state) if keyframe else len(delta["set"]) + len(delta["removed"]),
+    }
+
+
+async def score_series(db: AsyncSession, campaign_id: str, since=None, until=None, bucket: str | None = None,
+                       limit: int = 500) -> list[dict]:
+    """
+    Trust score over time from ix_campaign_iterations_campaign_run_at (index-only:
+    the index carries trust_score). Raw runs, or avg/min/max per `bucket`: the
+    newest `limit` points in the window, returned oldest first.
+    """
+    params = {"campaign_id": str(campaign_id), "since": since, "until": until, "limit": limit, "bucket": bucket}
+    where = """
+        WHERE campaign_id = CAST(:campaign_id AS uuid)
+          AND (CAST(:since AS timestamptz) IS NULL OR run_at >= CAST(:since AS timestamptz))
+          AND (CAST(:until AS timestamptz) IS NULL OR run_at < CAST(:until AS timestamptz))
+    """
+    if bucket is None:
+        query = f"""
+            SELECT run_at, trust_score FROM (
+                SELECT run_at, trust_score FROM app.campaign_iterations {where}
+                ORDER BY run_at DESC LIMIT :limit
+            ) latest ORDER BY run_at
+        """
+    else:
+        query = f"""
+            SELECT date_trunc(CAST(:bucket AS text), run_at) AS bucket, count(*) AS runs,
+                   round(avg(trust_score))::int AS avg_score, min(trust_score) AS min_score,
+                   max(trust_score) AS max_score
+            FROM app.campaign_iterations {where}
+            GROUP BY 1 ORDER BY 1 DESC LIMIT :limit
+        """
+        query = f"SELECT * FROM ({query}) latest ORDER BY bucket"
+    return [dict(r) for r in (await db.execute(text(query), params)).mappings()]
@@ -1,13 +1,62 @@
-# toy rules to catch India-EN issues; expand later
-RULES = [
-    ("call me back with money", "May signal high intent in Indian English; avoid negative scoring."),
-    ("expert", "Consider 'specialist' or 'advisor' for trust tone."),
-]
-
-def scan_copy(text: str) -> dict:
-    hits = [hint for phrase, hint in RULES if phrase.lower() in text.lower()]
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from app.services.marketing_qa.aho_corasick import AhoCorasick
+
+# Rule packs: one JSON file per locale/theme, {"pack", "rules": [{"phrase", "hint", "whole_word"?}]}
+RULES_DIR = Path(os.getenv("COPY_RULES_DIR", Path(__file__).parent / "rules"))
+MAX_OFFSETS = 20  # per phrase in the report; counts are always complete
+
+
+def rule_pack_files(packs: tuple[str, ...] | None = None) -> list[Path]:
+    files = sorted(RULES_DIR.glob("*.json"))
+    return [f for f in files if packs is None or f.stem in packs]
+
+
+@lru_cache(maxsize=16)
+def _compile(files: tuple[tuple[str, int], ...]):
+    """Keyed on (path, mtime), so editing a pack recompiles on the next scan"""
+    rules = []
+    for path, _ in files:
+        with open(path) as f:
+            pack = json.load(f)
+        for rule in pack["rules"]:
+            rules.append({"pack": pack.get("pack", Path(path).stem), "whole_word": False, **rule})
+    return AhoCorasick(r["phrase"] for r in rules), rules
+
+
+def get_matcher(packs: tuple[str, ...] | None = None):
+    """(automaton, rules) for the selected packs (all by default); compiled once and cached"""
+    files = tuple((str(f), f.stat().st_mtime_ns) for f in rule_pack_files(packs))
+    return _compile(files)
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def scan_copy(text: str, packs: tuple[str, ...] | None = None) -> dict:
+    """One pass over the text for every rule in the selected packs"""
+    matcher, rules = get_matcher(packs)
+    matches = {}
+    for start, end, index in matcher.finditer(text):
+        rule = rules[index]
+        if rule["whole_word"] and ((start > 0 and _is_word_char(text[start - 1]))
+                                   or (end < len(text) and _is_word_char(text[end]))):
+            continue
+        match = matches.get(index)
+        if match is None:
+            match = matches[index] = {"phrase": rule["phrase"], "hint": rule["hint"], "pack": rule["pack"],
+                                      "count": 0, "offsets": []}
+        match["count"] += 1
+        if len(match["offsets"]) < MAX_OFFSETS:
+            match["offsets"].append(start)
+
+    ordered = [matches[i] for i in sorted(matches)]
     return {
         "check":"copy_bias_scan",
-        "status": "warning" if hits else "pass",
-        "details":{"findings": hits}
+        "status": "warning" if ordered else "pass",
+        "details":{"findings": list(dict.fromkeys(m["hint"] for m in ordered)), "matches": ordered}
     }
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlCache:
+    """
+    Per-URL memory of the last crawl, one small JSON file per page:
+    validators (ETag / Last-Modified), a sha256 of the body and the check
+    results computed from it. PageFetcher sends conditional GETs from it and
+    marks a page "unchanged" on a 304 or an identical body, so its results
+    are reused instead of re-scanned. Bodies themselves are not stored.
+
+    Entries carry the checks version they were computed with; a different
+    version (a rule or vendor pack changed) ignores them, so the next fetch
+    is a plain GET. MARKETING_CRAWL_CACHE=0 turns it off.
+    """
+
+    def __init__(self, directory: str | None = None, max_age: float | None = None, enabled: bool | None = None):
+        self.directory = Path(directory or os.getenv(
+            "MARKETING_CRAWL_CACHE_DIR", Path(tempfile.gettempdir()) / "sacred_qa_crawl_cache"))
+        self.max_age = max_age or float(os.getenv("MARKETING_CRAWL_CACHE_MAX_AGE", str(7 * 86400)))
+        self.enabled = enabled if enabled is not None else os.getenv("MARKETING_CRAWL_CACHE", "1") == "1"
+        self.stats = {"not_modified": 0, "unchanged": 0, "changed": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def get(self, url: str, version: str) -> dict | None:
+        """The entry for `url` if it was stored under `version` and is younger than max_age"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(url)) as f:
+                entry = json.load(f)
+            if not self._well_formed(entry):
+                raise ValueError("not a cache entry")
+        except FileNotFoundError:
+            entry = None
+        except (OSError, ValueError) as e:
+            logger.warning(f"crawl cache: unreadable entry for {url}: {e}")
+            self.stats["errors"] += 1
+            entry = None
+        if entry is None or entry.get("version") != version or time.time() - entry["stored_at"] > self.max_age:
+            self.stats["misses"] += 1
+            return None
+        return entry
+
+    @staticmethod
+    def _well_formed(entry) -> bool:
+        """Truncated or hand-edited files can still be valid JSON"""
+        return (isinstance(entry, dict) and isinstance(entry.get("version"), str)
+                and isinstance(entry.get("stored_at"), (int, float)) and not isinstance(entry["stored_at"], bool)
+                and isinstance(entry.get("results"), list) and isinstance(entry.get("content_hash"), str))
+
+    @staticmethod
+    def validators(entry: dict | None) -> dict:
+        """Conditional request headers for a cached entry"""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, version: str, page: dict, results: list[dict]):
+        """Remember a successfully fetched page's validators, body hash and check results"""
+        if not self.enabled or page["error"] or page["status_code"] != 200:
+            return
+        self._store(url, {
+            "url": url, "version": version, "stored_at": time.time(),
+            "final_url": page["final_url"], "etag": page.get("etag"), "last_modified": page.get("last_modified"),
+            "content_hash": page["content_hash"], "results": results,
+        })
+
+    def touch(self, url: str, entry: dict, page: dict):
+        """
+        A revalidated entry (304, or the same body) is fresh again: restart its
+        max_age and keep any new validators the server sent, so a page that
+        never changes is not re-scanned every max_age.
+        """
+        if not self.enabled:
+            return
+        fresh = {k: page[k] for k in ("etag", "last_modified") if page.get(k)}
+        self._store(url, {**entry, **fresh, "stored_at": time.time()})
+
+    def _store(self, url: str, entry: dict):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # write-then-rename: concurrent runs never read a half-written entry
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp, self._path(url))
+            self.stats["stores"] += 1
+        except OSError as e:
+            logger.warning(f"crawl cache: could not store {url}: {e}")
+            self.stats["errors"] += 1
+
+    def prune(self) -> int:
+        """Delete entries older than max_age; returns how many were removed"""
+        removed = 0
+        cutoff = time.time() - self.max_age
+        for path in self.directory.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def metrics(self) -> dict:
+        return {"enabled": self.enabled, "directory": str(self.directory), **self.stats}
+
+
+crawl_cache = CrawlCache()
@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit, urlunsplit
+import httpx
+
+from app.core.http import crawler_client
+from app.services.marketing_qa.crawl_cache import CrawlCache
+from app.services.marketing_qa.visible_text import VisibleTextExtractor, visible_text
+
+
+def normalize_url(url: str) -> str:
+    """Dedup key: lower-case scheme/host, no fragment, '/' for an empty path"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
+
+
+class PageFetcher:
+    """
+    Fetch stage for a marketing QA run: every distinct page is downloaded
+    once, with at most `max_concurrency` requests in flight overall and
+    `per_host` per host, so a 500-URL campaign on one customer domain does
+    not open 500 simultaneous requests against it. Failures are returned per
+    page instead of failing the whole run. Bodies are parsed to visible text
+    as they download; pages carry both "html" (pixel checks) and "text"
+    (copy checks).
+
+    With a `cache` (CrawlCache), known pages are fetched conditionally. On a
+    304, or a body whose hash matches the cached one, the page comes back with
+    "cached_results" (the results stored under `cache_version`) and no body to
+    scan.
+    """
+
+    def __init__(self, client: httpx.AsyncClient | None = None, max_concurrency: int | None = None,
+                 per_host: int | None = None, cache: CrawlCache | None = None, cache_version: str = ""):
+        self.client = client or crawler_client.get()
+        self.max_concurrency = max_concurrency or int(os.getenv("MARKETING_FETCH_CONCURRENCY", "20"))
+        self.per_host = per_host or int(os.getenv("MARKETING_FETCH_PER_HOST", "4"))
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._hosts = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        self.cache = cache
+        self.cache_version = cache_version
+        self._pages = {}
+
+    async def fetch_all(self, urls: list[str]) -> dict:
+        """{normalized url: page}, one download per distinct URL"""
+        keys = list(dict.fromkeys(normalize_url(u) for u in urls))
+        await asyncio.gather(*(self.fetch(k) for k in keys))
+        return {k: self._pages[k].result() for k in keys}
+
+    async def stream(self, urls: list[str]):
+        """
+        Yield pages as they finish, one per distinct URL, without keeping them:
+        `max_concurrency` workers pull URLs and hand each page over a one-slot
+        queue, so at most max_concurrency + 1 bodies are alive at any time.
+        A worker that dies is noticed while waiting on the queue and its
+        exception re-raised, instead of leaving the consumer waiting forever.
+        """
+        keys = list(dict.fromkeys(normalize_url(u) for u in urls))
+        todo = asyncio.Queue()
+        for key in keys:
+            todo.put_nowait(key)
+        done = asyncio.Queue(maxsize=1)
+
+        async def worker():
+            while True:
+                try:
+                    key = todo.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await done.put(await self._download(key))
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.max_concurrency, len(keys)))]
+        running = set(workers)
+        getter = None
+        try:
+            for _ in keys:
+                getter = asyncio.ensure_future(done.get())
+                while not getter.done():
+                    finished, _ = await asyncio.wait({getter, *running}, return_when=asyncio.FIRST_COMPLETED)
+                    for task in finished - {getter}:
+                        running.discard(task)
+                        if task.exception() is not None:
+                            raise task.exception()
+                yield getter.result()
+        finally:
+            if getter is not None:
+                getter.cancel()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def fetch(self, url: str) -> asyncio.Future:
+        key = normalize_url(url)
+        if key not in self._pages:
+            self._pages[key] = asyncio.ensure_future(self._download(key))
+        return self._pages[key]
+
+    async def _download(self, url: str) -> dict:
+        host = urlsplit(url).netloc
+        start = time.perf_counter()
+        # cache entries are small files, but still disk I/O: keep it off the event loop
+        entry = await asyncio.to_thread(self.cache.get, url, self.cache_version) if self.cache else None
+        async with self._hosts[host], self._global:
+            try:
+                # no entry: extract while downloading; with one, the body is likely unchanged, so extract only if it is not
+                extractor = None if entry else VisibleTextExtractor()
+                chunks, digest = [], hashlib.sha256()
+                async with self.client.stream("GET", url, headers=CrawlCache.validators(entry),
+                                              follow_redirects=True) as r:
+                    if not (entry and r.status_code == 304):
+                        async for chunk in r.aiter_text():
+                            chunks.append(chunk)
+                            digest.update(chunk.encode())
+                            if extractor:
+                                extractor.feed(chunk)
+                page = {"url": url, "final_url": str(r.url), "status_code": r.status_code, "html": "", "text": "",
+                        "error": None, "etag": r.headers.get("etag"), "last_modified": r.headers.get("last-modified"),
+                        "content_hash": digest.hexdigest(), "cached_results": None}
+                if entry and r.status_code == 304:
+                    self.cache.stats["not_modified"] += 1
+                    page.update(final_url=entry["final_url"], content_hash=entry["content_hash"],
+                                cached_results=entry["results"])
+                elif entry and page["content_hash"] == entry["content_hash"]:
+                    self.cache.stats["unchanged"] += 1
+                    page["cached_results"] = entry["results"]
+                else:
+                    if entry:
+                        self.cache.stats["changed"] += 1
+                    page["html"] = "".join(chunks)
+                    if extractor:
+                        extractor.close()
+                        page["text"] = extractor.text
+                    else:
+                        page["text"] = await asyncio.to_thread(visible_text, page["html"])
+            except Exception as e:  # InvalidURL, parser errors on odd markup...: one bad page never sinks the run
+                page = {"url": url, "final_url": None, "status_code": None, "html": "", "text": "",
+                        "error": f"{type(e).__name__}: {e}", "cached_results": None}
+        if page["cached_results"] is not None:
+            await asyncio.to_thread(self.cache.touch, url, entry, page)
+        page["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return page
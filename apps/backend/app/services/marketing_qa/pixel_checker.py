@@ -1,18 +1,118 @@
-import re, httpx
-
-# very simple GA4 / GTM presence heuristics
-GA4_RE   = re.compile(r"gtag\\(\\'config\\',\\s*['\"]G-[A-Z0-9]+['\"]\\)")
-GTM_RE   = re.compile(r"googletagmanager.com/gtm.js\\?id=GTM-")
-META_RE  = re.compile(r"connect\\.facebook\\.net/.*/fbevents\\.js")
-
-async def check_pixels(url: str) -> dict:
-    async with httpx.AsyncClient(timeout=10) as client:
-        r = await client.get(url, follow_redirects=True)
-    html = r.text
-    found = {
-        "ga4": bool(GA4_RE.search(html)),
-        "gtm": bool(GTM_RE.search(html)),
-        "meta": bool(META_RE.search(html)),
-    }
-    status = "pass" if any(found.values()) else "warning"
-    return {"check":"pixel_presence","status":status,"details":found}
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from app.services.marketing_qa.aho_corasick import AhoCorasick
+
+# Vendor packs: one JSON file per family, {"pack", "vendors": [{"vendor", "category", "signatures": [regex]}]}
+# A signature is a regex that starts with a literal (its anchor, >= MIN_ANCHOR chars, an optional
+# lookbehind aside) and may capture the tracking ID as (?P<id>...).
+VENDORS_DIR = Path(os.getenv("PIXEL_VENDORS_DIR", Path(__file__).parent / "vendors"))
+MAX_LOCATIONS = 20  # per vendor in the report
+MIN_ANCHOR = 3
+# AhoCorasick strategy for the anchors. The packs hold a few dozen, well under FIND_THRESHOLD, so
+# "auto" scans them with str.find() (about 9x faster than the Python automaton walk on
+# scripts/bench_pixel_detector.py); "automaton" forces the single pass.
+MATCH_STRATEGY = os.getenv("PIXEL_MATCH_STRATEGY", "auto")
+LEGACY_KEYS = ("ga4", "gtm", "meta")  # kept as booleans in details for existing consumers
+TRACKING_CATEGORIES = {"analytics", "tag_manager", "ads"}
+
+
+def vendor_pack_files(packs: tuple[str, ...] | None = None) -> list[Path]:
+    files = sorted(VENDORS_DIR.glob("*.json"))
+    return [f for f in files if packs is None or f.stem in packs]
+
+
+def literal_prefix(pattern: str) -> str:
+    """
+    The literal text every match of `pattern` starts with: leading lookbehinds
+    and the ID group's opening are stepped over, escapes unescaped, and the
+    scan stops at the first metacharacter or quantified character.
+    """
+    lookbehind = re.match(r"\(\?<[=!][^)]*\)", pattern)
+    i = lookbehind.end() if lookbehind else 0
+    out = []
+    while i < len(pattern):
+        if pattern.startswith("(?P<id>", i):
+            i += len("(?P<id>")
+            continue
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+            literal, step = pattern[i + 1], 2
+        elif ch in ".^$*+?{}[]()|\\":
+            break
+        else:
+            literal, step = ch, 1
+        if pattern[i + step:i + step + 1] in ("?", "*", "{"):
+            break
+        out.append(literal)
+        i += step
+    return "".join(out)
+
+
+@lru_cache(maxsize=16)
+def _compile(files: tuple[tuple[str, int], ...], strategy: str):
+    """
+    Each signature is reduced to its literal prefix (its anchor); all anchors go
+    into one AhoCorasick matcher and the signature regex only runs, anchored,
+    where its anchor was found. Keyed on (path, mtime), so editing a pack
+    recompiles on the next check.
+    """
+    anchors, signatures = {}, []
+    for path, _ in files:
+        with open(path) as f:
+            pack = json.load(f)
+        for vendor in pack["vendors"]:
+            for pattern in vendor["signatures"]:
+                anchor = literal_prefix(pattern).lower()
+                if len(anchor) < MIN_ANCHOR:
+                    raise ValueError(f"{path}: signature {pattern!r} needs a literal prefix of "
+                                     f"at least {MIN_ANCHOR} characters")
+                anchors.setdefault(anchor, []).append(len(signatures))
+                signatures.append({"vendor": vendor["vendor"], "category": vendor["category"],
+                                   "pattern": pattern, "regex": re.compile(pattern, re.IGNORECASE),
+                                   "has_id": "(?P<id>" in pattern})
+    return AhoCorasick(anchors, strategy), list(anchors.values()), signatures
+
+
+def get_detector(packs: tuple[str, ...] | None = None, strategy: str | None = None):
+    """(matcher, signature indexes per anchor, signatures) for the selected packs (all by default); cached"""
+    files = tuple((str(f), f.stat().st_mtime_ns) for f in vendor_pack_files(packs))
+    return _compile(files, strategy or MATCH_STRATEGY)
+
+
+def detect_vendors(html: str, packs: tuple[str, ...] | None = None, strategy: str | None = None) -> dict:
+    """One scan for all anchors: {vendor: {"category", "ids", "locations": [{"offset", "line"}]}}"""
+    matcher, by_anchor, signatures = get_detector(packs, strategy)
+    hits = []
+    for start, _, anchor in matcher.finditer(html):
+        for index in by_anchor[anchor]:
+            m = signatures[index]["regex"].match(html, start)
+            if m:
+                hits.append((start, index, m))
+    vendors = {}
+    line, last = 1, 0
+    for start, index, m in sorted(hits, key=lambda hit: hit[:2]):
+        signature = signatures[index]
+        found = vendors.get(signature["vendor"])
+        if found is None:
+            found = vendors[signature["vendor"]] = {"category": signature["category"], "ids": [], "locations": []}
+        if signature["has_id"] and m.group("id") not in found["ids"]:
+            found["ids"].append(m.group("id"))
+        locations = found["locations"]
+        if len(locations) < MAX_LOCATIONS and not (locations and locations[-1]["offset"] == start):
+            line += html.count("\n", last, start)
+            last = start
+            locations.append({"offset": start, "line": line})
+    return vendors
+
+
+def check_pixels(html: str) -> dict:
+    """Works on already-fetched HTML (see fetcher.PageFetcher)"""
+    vendors = detect_vendors(html)
+    found = {key: key in vendors for key in LEGACY_KEYS}
+    tracking = any(v["category"] in TRACKING_CATEGORIES for v in vendors.values())
+    status = "pass" if tracking else "warning"
+    return {"check":"pixel_presence","status":status,"details":{**found, "vendors": vendors}}
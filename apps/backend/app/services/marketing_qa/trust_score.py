@@ -1,6 +1,129 @@
-def compute_score(results: list[dict]) -> int:
-    # simple: pass=1, warning=0.5, fail=0
-    weights = {"pass":1.0,"warning":0.5,"fail":0.0}
-    if not results: return 0
-    s = sum(weights.get(r.get("status","fail"),0) for r in results)
-    return round(100 * s / len(results))
+import logging
+import math
+import os
+
+logger = logging.getLogger(__name__)
+
+# simple: pass=1, warning=0.5, fail=0
+WEIGHTS = {"pass":1.0,"warning":0.5,"fail":0.0}
+
+
+def parse_check_weights(spec: str) -> dict:
+    """
+    'pixel_presence=2,copy_bias_scan=0.5' -> {"pixel_presence": 2.0, "copy_bias_scan": 0.5}.
+    Malformed entries are skipped with a warning rather than failing the import.
+    """
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        check, _, weight = item.partition("=")
+        try:
+            value = float(weight)
+            if not check.strip() or not math.isfinite(value) or value < 0:
+                raise ValueError
+        except ValueError:
+            logger.warning(f"TRUST_CHECK_WEIGHTS: ignoring {item!r} (expected check=non-negative number)")
+            continue
+        weights[check.strip()] = value
+    return weights
+
+
+# how much each check type counts towards the score; unlisted checks weigh 1
+CHECK_WEIGHTS = parse_check_weights(os.getenv("TRUST_CHECK_WEIGHTS", ""))
+
+
+def compute_score(results: list[dict], check_weights: dict | None = None) -> int:
+    score = TrustScoreAccumulator(check_weights, per_url=False)
+    score.extend(results)
+    return score.score
+
+
+class TrustScoreAccumulator:
+    """
+    compute_score() kept up to date one result at a time, for streamed runs.
+
+    Each result counts `check_weights[check]` (default 1) times its status
+    weight. Subtotals are kept per check type and, with per_url, per URL.
+    Accumulators from parallel workers combine with merge(); state() /
+    from_state() carry one across processes as plain JSON, so a sharded
+    audit never needs every result in one list.
+    """
+
+    def __init__(self, check_weights: dict | None = None, per_url: bool = True):
+        self.check_weights = CHECK_WEIGHTS if check_weights is None else check_weights
+        self.per_url = per_url
+        self.total = 0.0   # weighted points
+        self.weight = 0.0  # weighted results
+        self.count = 0
+        self.by_check = {}  # check -> [points, weight, count]
+        self.by_url = {}    # url -> [points, weight, count]
+
+    def add(self, result: dict, url: str | None = None):
+        check = result.get("check", "unknown")
+        weight = self.check_weights.get(check, 1.0)
+        points = weight * WEIGHTS.get(result.get("status","fail"),0)
+        self.total += points
+        self.weight += weight
+        self.count += 1
+        self._bump(self.by_check, check, points, weight)
+        if self.per_url and url is not None:
+            self._bump(self.by_url, url, points, weight)
+
+    def extend(self, results: list[dict], url: str | None = None):
+        for r in results:
+            self.add(r, url)
+
+    @staticmethod
+    def _bump(table: dict, key: str, points: float, weight: float, count: int = 1):
+        row = table.get(key)
+        if row is None:
+            table[key] = [points, weight, count]
+        else:
+            row[0] += points
+            row[1] += weight
+            row[2] += count
+
+    def merge(self, other: "TrustScoreAccumulator") -> "TrustScoreAccumulator":
+        """Fold another worker's partial totals into this one (same weights required)"""
+        if other.check_weights != self.check_weights:
+            raise ValueError("cannot merge trust scores computed with different check weights")
+        self.total += other.total
+        self.weight += other.weight
+        self.count += other.count
+        for mine, theirs in ((self.by_check, other.by_check), (self.by_url, other.by_url)):
+            for key, (points, weight, count) in theirs.items():
+                self._bump(mine, key, points, weight, count)
+        return self
+
+    @staticmethod
+    def _percent(points: float, weight: float) -> int:
+        return round(100 * points / weight) if weight else 0
+
+    @property
+    def score(self) -> int:
+        return self._percent(self.total, self.weight)
+
+    def url_score(self, url: str) -> int:
+        points, weight, _ = self.by_url.get(url, (0.0, 0.0, 0))
+        return self._percent(points, weight)
+
+    def breakdown(self, urls: bool = False) -> dict:
+        """{"score", "count", "by_check": {check: {"score", "count"}}} (+ "by_url" when asked)"""
+        out = {
+            "score": self.score, "count": self.count,
+            "by_check": {k: {"score": self._percent(p, w), "count": c} for k, (p, w, c) in self.by_check.items()},
+        }
+        if urls:
+            out["by_url"] = {k: {"score": self._percent(p, w), "count": c} for k, (p, w, c) in self.by_url.items()}
+        return out
+
+    def state(self) -> dict:
+        return {"check_weights": self.check_weights, "per_url": self.per_url, "total": self.total,
+                "weight": self.weight, "count": self.count, "by_check": self.by_check, "by_url": self.by_url}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "TrustScoreAccumulator":
+        acc = cls(state["check_weights"], state["per_url"])
+        acc.total, acc.weight, acc.count = state["total"], state["weight"], state["count"]
+        acc.by_check = {k: list(v) for k, v in state["by_check"].items()}
+        acc.by_url = {k: list(v) for k, v in state["by_url"].items()}
+        return acc
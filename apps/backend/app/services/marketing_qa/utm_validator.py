@@ -1,20 +1,116 @@
-import re
-from urllib.parse import urlparse, parse_qs
+import os
+from collections import Counter, defaultdict
+from functools import lru_cache
+from urllib.parse import urlsplit, parse_qsl
 
 REQUIRED = ("utm_source","utm_medium","utm_campaign")
+UTM_PARAMS = REQUIRED + ("utm_content","utm_term")
+# GA4 default channel grouping mediums plus common house variants; UTM_KNOWN_MEDIUMS (comma list) overrides
+DEFAULT_MEDIUMS = ("cpc","ppc","paidsearch","paid_search","cpm","cpv","cpa","display","banner","retargeting",
+                   "email","newsletter","social","paid_social","paidsocial","social-paid","organic",
+                   "organic_social","referral","affiliate","partner","sms","push","mobile","video","audio",
+                   "podcast","qr","print","offline","ooh","influencer")
+KNOWN_MEDIUMS = frozenset(m.strip().lower() for m in os.getenv("UTM_KNOWN_MEDIUMS", ",".join(DEFAULT_MEDIUMS)).split(","))
+MAX_EXAMPLES = 20  # failing URLs listed in a batch summary; counts are always complete
+CACHE_SIZE = int(os.getenv("UTM_PARSE_CACHE_SIZE", "65536"))
+
+
+def normalize_tracking_url(url: str) -> str:
+    """
+    Dedup key for tracked links: lower-case scheme/host, no fragment, '/' for an
+    empty path, query pairs sorted. Runs once per link in a batch, so it works
+    on the raw string; decoding waits for parse_utm, once per distinct link.
+    """
+    base, _, query = url.strip().partition("#")[0].partition("?")
+    scheme, sep, rest = base.partition("://")
+    if sep:
+        host, _, path = rest.partition("/")
+        base = f"{scheme.lower()}://{host.lower()}/{path}"
+    query = "&".join(sorted(pair for pair in query.split("&") if pair))
+    return f"{base}?{query}" if query else base
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_utm(normalized_url: str) -> tuple[tuple[str, ...], tuple[tuple[str, str], ...]]:
+    """(missing required params, ((param, value), ...)) for a normalized URL; blank values count as missing"""
+    values = {}
+    for key, value in parse_qsl(urlsplit(normalized_url).query):
+        if key in UTM_PARAMS:
+            values.setdefault(key, value)
+    missing = tuple(p for p in REQUIRED if p not in values)
+    return missing, tuple((p, values[p]) for p in UTM_PARAMS if p in values)
+
+
+def _result(url: str, missing: tuple, values: tuple) -> dict:
+    found = [p for p in REQUIRED if p not in missing]
+    return {
+        "check": "utm_params",
+        "status": "pass" if not missing else "fail",
+        "details": {
+            "url": url,
+            "found": found,
+            "missing": list(missing),
+            "values": dict(values),
+            "summary": f"Found {len(found)}/{len(REQUIRED)} required UTM parameters",
+        },
+    }
 
 
 def validate_utm(url: str) -> dict:
-    """Check UTM parameter presence and consistency"""
-    parsed = urlparse(url)
-    params = parse_qs(parsed.query)
-    
-    required_utms = ['utm_source', 'utm_medium', 'utm_campaign']
-    found_utms = [p for p in required_utms if p in params]
-    
+    """Check UTM parameter presence for one URL (parsed once per normalized URL, then memoized)"""
+    return _result(url, *parse_utm(normalize_tracking_url(url)))
+
+
+def validate_utm_batch(urls: list[str]) -> dict:
+    """
+    Campaign audit in one pass over `urls`: each distinct (normalized) link is
+    validated once, and presence, casing drift (the same value spelled
+    "Facebook" and "facebook") and unknown utm_medium values are tallied as we go.
+    Returns {"results": {normalized url: result}, "consistency": check result}.
+    """
+    results = {}
+    missing_counts = Counter()
+    variants = defaultdict(lambda: defaultdict(Counter))  # param -> lower(value) -> spelling -> links
+    unknown_mediums = Counter()
+    failing = []
+    passed = 0
+    for url in urls:
+        key = normalize_tracking_url(url)
+        if key in results:
+            continue
+        missing, values = parse_utm(key)
+        results[key] = _result(url, missing, values)
+        if not missing:
+            passed += 1
+        else:
+            missing_counts.update(missing)
+            if len(failing) < MAX_EXAMPLES:
+                failing.append(url)
+        for param, value in values:
+            variants[param][value.lower()][value] += 1
+            if param == "utm_medium" and value.lower() not in KNOWN_MEDIUMS:
+                unknown_mediums[value] += 1
+
+    drift = {
+        param: {lowered: dict(spellings) for lowered, spellings in by_value.items() if len(spellings) > 1}
+        for param, by_value in variants.items()
+    }
+    drift = {param: values for param, values in drift.items() if values}
     return {
-        "status": "pass" if len(found_utms) == len(required_utms) else "fail",
-        "found": found_utms,
-        "missing": [p for p in required_utms if p not in found_utms],
-        "details": f"Found {len(found_utms)}/{len(required_utms)} required UTM parameters"
+        "results": results,
+        "consistency": {
+            "check": "utm_consistency",
+            "status": "warning" if drift or unknown_mediums else "pass",
+            "details": {
+                "total": len(urls),
+                "unique": len(results),
+                "duplicates": len(urls) - len(results),
+                "passed": passed,
+                "failed": len(results) - passed,
+                "missing_counts": dict(missing_counts),
+                "failing_examples": failing,
+                "casing_drift": drift,
+                "unknown_mediums": dict(unknown_mediums),
+            },
+        },
     }
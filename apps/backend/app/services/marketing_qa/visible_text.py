@@ -0,0 +1,100 @@
+import re
+from html.parser import HTMLParser
+
+# subtrees whose text never renders as page copy
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "math", "iframe", "object", "head"}
+# text inside these is still visible even though it sits in <head>
+KEEP_IN_SKIPPED = {"title"}
+# boundaries between these become whitespace so words from adjacent blocks do not run together
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "details", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li",
+    "main", "nav", "ol", "option", "p", "pre", "section", "summary", "table", "td", "th", "tr", "ul",
+    "button", "label", "title",
+}
+# end tags may be omitted, so a hidden one cannot be skipped as a subtree safely
+OPTIONAL_END_TAGS = {"p", "li", "dt", "dd", "option", "tr", "td", "th", "thead", "tbody", "tfoot", "colgroup"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.I)
+WHITESPACE = re.compile(r"\s+")
+
+
+class VisibleTextExtractor(HTMLParser):
+    """
+    Incremental HTML -> visible text: feed() chunks as they arrive, no DOM.
+
+    Drops script/style/noscript/template/svg/iframe content, <head> except
+    <title>, comments, and elements marked hidden (hidden attribute,
+    aria-hidden="true", inline display:none / visibility:hidden). Inline tags
+    are transparent, so "call me <b>back</b>" still reads as one phrase;
+    block tags become a space. Whitespace is collapsed.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._parts = []
+        self._skip_tag = None
+        self._skip_depth = 0
+        self._keep = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_tag == "head" and tag == "body":
+            # </head> is optional
+            self._skip_tag, self._keep = None, 0
+        if self._skip_tag:
+            if tag in KEEP_IN_SKIPPED:
+                self._keep += 1
+            elif tag == self._skip_tag and tag not in VOID_TAGS:
+                self._skip_depth += 1
+            return
+        if tag in SKIP_TAGS or (tag not in OPTIONAL_END_TAGS and self._hidden(attrs)):
+            if tag not in VOID_TAGS:
+                self._skip_tag, self._skip_depth = tag, 1
+            return
+        if tag in BLOCK_TAGS:
+            self._parts.append(" ")
+
+    def handle_startendtag(self, tag, attrs):
+        if not self._skip_tag and tag in BLOCK_TAGS:
+            self._parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if self._skip_tag:
+            if tag in KEEP_IN_SKIPPED and self._keep:
+                self._keep -= 1
+                self._parts.append(" ")
+            elif tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+                    self._keep = 0
+                    self._parts.append(" ")
+            return
+        if tag in BLOCK_TAGS:
+            self._parts.append(" ")
+
+    def handle_data(self, data):
+        if not self._skip_tag or self._keep:
+            self._parts.append(data)
+
+    @staticmethod
+    def _hidden(attrs) -> bool:
+        for name, value in attrs:
+            if name == "hidden":
+                return True
+            if name == "aria-hidden" and (value or "").lower() == "true":
+                return True
+            if name == "style" and value and HIDDEN_STYLE.search(value):
+                return True
+        return False
+
+    @property
+    def text(self) -> str:
+        return WHITESPACE.sub(" ", "".join(self._parts)).strip()
+
+
+def visible_text(html: str) -> str:
+    parser = VisibleTextExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser.text
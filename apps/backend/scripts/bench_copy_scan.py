@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+copy_bias_scan: per-rule lower()+substring loop vs the compiled Aho-Corasick pass.
+
+    python scripts/bench_copy_scan.py --rules 10 100 1000 5000 --doc-kb 200
+
+Synthetic rule sets and a synthetic HTML page; both scanners must agree on
+which phrases are present. A second table scans a script-heavy page as raw
+HTML vs extracted visible text.
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.services.marketing_qa.aho_corasick import AhoCorasick
+from app.services.marketing_qa.visible_text import visible_text
+
+
+def legacy_scan(text: str, phrases: list[str]) -> set:
+    return {p for p in phrases if p.lower() in text.lower()}
+
+
+def automaton_scan(text: str, matcher: AhoCorasick) -> set:
+    return {matcher.patterns[i] for _, _, i in matcher.finditer(text)}
+
+
+def synthetic_doc(kb: int, words: list[str]) -> str:
+    out, size = [], 0
+    while size < kb * 1024:
+        chunk = "<p>" + " ".join(random.choice(words) for _ in range(20)) + "</p>\n"
+        out.append(chunk)
+        size += len(chunk)
+    return "".join(out)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rules", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--doc-kb", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(7)
+    vocab = ["".join(random.choices(string.ascii_lowercase, k=random.randint(3, 9))) for _ in range(5000)]
+    doc = synthetic_doc(args.doc_kb, vocab)
+    print(f"document: {len(doc) / 1024:.0f} KiB")
+    print(f"{'rules':>6} {'compile ms':>11} {'legacy ms':>10} {'automaton ms':>13} {'speedup':>8}")
+    for n in args.rules:
+        phrases = [" ".join(random.sample(vocab, random.randint(1, 2))) for _ in range(n)]
+        start = time.perf_counter()
+        matcher = AhoCorasick(phrases)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        legacy_ms = automaton_ms = float("inf")
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            expected = legacy_scan(doc, phrases)
+            legacy_ms = min(legacy_ms, (time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            found = automaton_scan(doc, matcher)
+            automaton_ms = min(automaton_ms, (time.perf_counter() - start) * 1000)
+        assert found == expected, "scanners disagree"
+        print(f"{n:>6} {compile_ms:>11.1f} {legacy_ms:>10.1f} {automaton_ms:>13.1f} {legacy_ms / automaton_ms:>7.1f}x")
+
+    # typical landing page: a little copy, a lot of bundled JS and JSON state
+    script = "<script>" + ";".join(f"var {w}={{'{w}':'{random.choice(vocab)}'}}" for w in random.choices(vocab, k=20000)) + "</script>"
+    page = "<html><head>" + script + "</head><body>" + synthetic_doc(max(args.doc_kb // 10, 1), vocab) + script + "</body></html>"
+    matcher = AhoCorasick([" ".join(random.sample(vocab, random.randint(1, 2))) for _ in range(max(args.rules))])
+    start = time.perf_counter()
+    raw_hits = len(automaton_scan(page, matcher))
+    raw_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    text = visible_text(page)
+    extract_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    text_hits = len(automaton_scan(text, matcher))
+    text_ms = (time.perf_counter() - start) * 1000
+    print(f"\nscript-heavy page {len(page) / 1024:.0f} KiB, visible text {len(text) / 1024:.0f} KiB, {len(matcher)} rules")
+    print(f"raw html scan      {raw_ms:>8.1f} ms  ({raw_hits} phrases hit)")
+    print(f"extract + scan     {extract_ms + text_ms:>8.1f} ms  ({text_hits} phrases hit; extract {extract_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Crawl cache: a cold run vs re-runs answered with 304 / unchanged bodies.
+
+    python scripts/bench_crawl_cache.py --pages 300 --page-kb 200 --latency-ms 20
+
+Pages on 10 hosts are served in-process (httpx.MockTransport) with a fixed latency; half
+of them send an ETag (re-runs get 304), half do not (re-runs download and
+compare hashes). Uses a throwaway cache directory.
+"""
+import argparse
+import asyncio
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.services.marketing_qa.crawl_cache import CrawlCache
+from app.services.marketing_qa.fetcher import PageFetcher
+from app.api.v1 import marketing
+
+
+def page_body(kb: int) -> str:
+    words = ["".join(random.choices(string.ascii_lowercase, k=random.randint(3, 9))) for _ in range(500)]
+    script = "<script>" + ";".join(f"var {w}=1" for w in random.choices(words, k=kb * 60)) + "</script>"
+    copy = "<p>" + " ".join(random.choices(words, k=kb * 40)) + " guaranteed results</p>"
+    return f"<html><head>{script}</head><body>{copy}</body></html>"
+
+
+async def run_once(client, urls, cache) -> float:
+    version = marketing.checks_version()
+    start = time.perf_counter()
+    fetcher = PageFetcher(client=client, cache=cache, cache_version=version)
+    pages = await fetcher.fetch_all(urls)
+    for url, page in pages.items():
+        marketing.check_page(url, page, version)
+    return (time.perf_counter() - start) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--page-kb", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    random.seed(5)
+    bodies = {f"/p/{i}": page_body(args.page_kb) for i in range(args.pages)}
+
+    async def handler(request):
+        await asyncio.sleep(args.latency_ms / 1000)
+        path = request.url.path
+        etag = f'"{hash(bodies[path])}"' if int(path.rsplit("/", 1)[1]) % 2 == 0 else None
+        if etag and request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        return httpx.Response(200, text=bodies[path], headers={"etag": etag} if etag else {})
+
+    urls = [f"https://lp{i % 10}.example.com{path}" for i, path in enumerate(bodies)]
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CrawlCache(directory=directory, enabled=True)
+        marketing.crawl_cache = cache  # check_page stores into the module's cache
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            cold = await run_once(client, urls, cache)
+            warm = await run_once(client, urls, cache)
+            for path in list(bodies)[: args.pages // 10]:
+                bodies[path] = page_body(args.page_kb)
+            partial = await run_once(client, urls, cache)
+    print(f"{args.pages} pages x {args.page_kb} KiB, {args.latency_ms:.0f} ms latency")
+    print(f"cold run                  {cold:>8.1f} ms")
+    print(f"re-run, nothing changed   {warm:>8.1f} ms")
+    print(f"re-run, 10% changed       {partial:>8.1f} ms")
+    print(cache.metrics())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+pixel_checker: one regex per signature (a pass each) vs the anchored detector
+(signature anchors found by AhoCorasick, regexes only at the hits), timed with both
+matcher strategies: "automaton" (one pass) and "find" (str.find per anchor), which is
+what "auto" picks for a pack set this small.
+
+    python scripts/bench_pixel_detector.py --corpus ~/saved-pages      # *.html, e.g. from "Save page as"
+    python scripts/bench_pixel_detector.py --pages 50 --page-kb 400     # synthetic corpus
+
+Both must report the same vendors per page. The three legacy regexes are timed
+too, with how many pages they flagged; they were double-escaped and rarely matched.
+"""
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.services.marketing_qa.pixel_checker import detect_vendors, get_detector
+
+LEGACY = [
+    re.compile(r"gtag\\(\\'config\\',\\s*['\"]G-[A-Z0-9]+['\"]\\)"),
+    re.compile(r"googletagmanager.com/gtm.js\\?id=GTM-"),
+    re.compile(r"connect\\.facebook\\.net/.*/fbevents\\.js"),
+]
+
+SNIPPETS = [
+    '<script async src="https://www.googletagmanager.com/gtag/js?id=G-7QX2M4K9PL"></script>'
+    "<script>gtag('config', 'G-7QX2M4K9PL');</script>",
+    "<script>(function(w,d,s,l,i){j.src='https://www.googletagmanager.com/gtm.js?id='+i})"
+    "(window,document,'script','dataLayer','GTM-5KZ8R2D');</script>",
+    "<script>!function(f,b,e,v){}(window,document,'script',"
+    "'https://connect.facebook.net/en_US/fbevents.js');fbq('init', '104857600123456');</script>",
+    '<script>_linkedin_partner_id = "4418201";</script>'
+    '<script src="https://snap.licdn.com/li.lms-analytics/insight.min.js"></script>',
+    "<script>ttq.load('CJ8QK3RC77U4T5O0B1TG');</script>",
+    "<script>(function(h){h._hjSettings={hjid:3561234,hjsv:6}})(window);</script>",
+    '<script src="https://cdn.cookielaw.org/scripttemplates/otSDKStub.js" '
+    'data-domain-script="0190a4c2-7d1e-7b3a-9f00-4c1d2e3f4a5b"></script>',
+    '<script id="Cookiebot" src="https://consent.cookiebot.com/uc.js" '
+    'data-cbid="6f1c2d3e-4a5b-4c6d-8e7f-9a0b1c2d3e4f"></script>',
+]
+
+
+def per_signature_scan(html: str, compiled: list) -> set:
+    return {vendor for vendor, pattern in compiled if pattern.search(html)}
+
+
+def synthetic_page(kb: int) -> str:
+    words = ["".join(random.choices(string.ascii_lowercase, k=random.randint(3, 9))) for _ in range(2000)]
+    body, size = [], 0
+    while size < kb * 1024:
+        chunk = random.choice([
+            "<p>" + " ".join(random.choices(words, k=30)) + "</p>\n",
+            "<script>" + ";".join(f"var {w}='{random.choice(words)}'" for w in random.choices(words, k=40)) + "</script>\n",
+        ])
+        body.append(chunk)
+        size += len(chunk)
+    for snippet in random.sample(SNIPPETS, random.randint(0, len(SNIPPETS))):
+        body.insert(random.randrange(len(body) + 1), snippet)
+    return "<html><head></head><body>" + "".join(body) + "</body></html>"
+
+
+def load_corpus(args) -> list[str]:
+    if args.corpus:
+        files = sorted(Path(args.corpus).expanduser().rglob("*.htm*"))
+        if not files:
+            sys.exit(f"no .html files under {args.corpus}")
+        return [f.read_text(errors="replace") for f in files]
+    random.seed(11)
+    return [synthetic_page(args.page_kb) for _ in range(args.pages)]
+
+
+def best_of(repeats: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="directory of saved pages; synthetic pages when omitted")
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--page-kb", type=int, default=300)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_corpus(args)
+    _, _, signatures = get_detector()
+    compiled = [(s["vendor"], re.compile(s["pattern"], re.IGNORECASE)) for s in signatures]
+    vendors = len({s["vendor"] for s in signatures})
+    print(f"corpus: {len(pages)} pages, {sum(map(len, pages)) / 1024 / 1024:.1f} MiB; "
+          f"{len(signatures)} signatures across {vendors} vendors")
+
+    expected = [per_signature_scan(page, compiled) for page in pages]
+    for strategy in ("automaton", "find"):
+        found = [set(detect_vendors(page, strategy=strategy)) for page in pages]
+        mismatched = sum(1 for a, b in zip(expected, found) if a != b)
+        assert not mismatched, f"{strategy} detector disagrees on {mismatched} pages"
+    legacy_hits = sum(1 for page in pages if any(r.search(page) for r in LEGACY))
+    tracked = sum(1 for f in found if f & {"ga4", "gtm", "meta"})
+
+    legacy_ms = best_of(args.repeats, lambda: [r.search(p) for p in pages for r in LEGACY])
+    per_sig_ms = best_of(args.repeats, lambda: [per_signature_scan(p, compiled) for p in pages])
+    automaton_ms = best_of(args.repeats, lambda: [detect_vendors(p, strategy="automaton") for p in pages])
+    find_ms = best_of(args.repeats, lambda: [detect_vendors(p, strategy="find") for p in pages])
+    matcher, _, _ = get_detector()
+    print(f"{'detector':<28} {'total ms':>9} {'ms/page':>8}")
+    print(f"{'legacy (3 regexes)':<28} {legacy_ms:>9.1f} {legacy_ms / len(pages):>8.2f}  "
+          f"flagged {legacy_hits} pages, GA4/GTM/Meta on {tracked}")
+    print(f"{f'one pass per signature ({len(compiled)})':<28} {per_sig_ms:>9.1f} {per_sig_ms / len(pages):>8.2f}")
+    for name, ms in (("anchored, automaton", automaton_ms), ("anchored, str.find", find_ms)):
+        print(f"{name:<28} {ms:>9.1f} {ms / len(pages):>8.2f}  {per_sig_ms / ms:.1f}x vs per-signature")
+    print(f"default strategy ({matcher.strategy}, {len(matcher)} anchors): "
+          f"{'automaton' if matcher.single_pass else 'str.find'}")
+
+
+if __name__ == "__main__":
+    main()
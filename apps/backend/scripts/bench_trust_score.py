@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+trust_score: collect-then-compute_score vs sharded TrustScoreAccumulator + merge.
+
+    python scripts/bench_trust_score.py --urls 200000 --workers 4
+
+Each URL yields 3 synthetic check results. The sharded run scores in worker
+processes and ships only accumulator state back; both must agree.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.services.marketing_qa.trust_score import TrustScoreAccumulator, compute_score
+
+CHECKS = ("utm_params", "pixel_presence", "copy_bias_scan")
+STATUSES = ("pass", "pass", "warning", "fail")
+
+
+def results_for(i: int) -> list[dict]:
+    rnd = random.Random(i)
+    return [{"check": c, "status": rnd.choice(STATUSES), "details": {}} for c in CHECKS]
+
+
+def shard(bounds: tuple[int, int], per_url: bool) -> dict:
+    score = TrustScoreAccumulator(per_url=per_url)
+    for i in range(*bounds):
+        score.extend(results_for(i), url=f"https://lp.example.com/{i}")
+    return score.state()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--per-url", action="store_true", help="keep per-URL subtotals in the sharded run")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    collected = []
+    for i in range(args.urls):
+        collected.extend(results_for(i))
+    expected = compute_score(collected)
+    list_ms = (time.perf_counter() - start) * 1000
+    del collected
+
+    step = -(-args.urls // args.workers)
+    bounds = [(lo, min(lo + step, args.urls)) for lo in range(0, args.urls, step)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        states = list(pool.map(shard, bounds, [args.per_url] * len(bounds)))
+    total = TrustScoreAccumulator(per_url=args.per_url)
+    for state in states:
+        total.merge(TrustScoreAccumulator.from_state(state))
+    sharded_ms = (time.perf_counter() - start) * 1000
+    assert total.score == expected, (total.score, expected)
+
+    print(f"{args.urls} urls, {args.urls * len(CHECKS)} results, score {expected}")
+    print(f"collect + compute_score    {list_ms:>9.0f} ms  (every result held in one list)")
+    print(f"{args.workers} workers + merge          {sharded_ms:>9.0f} ms  (per-URL subtotals: {args.per_url})")
+    print(total.breakdown()["by_check"])
+
+
+if __name__ == "__main__":
+    main()
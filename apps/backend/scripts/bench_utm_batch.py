@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+utm_validator: per-link urlparse/parse_qs loop (the old validate_utm) vs validate_utm_batch.
+
+    python scripts/bench_utm_batch.py --links 100000 --unique 20000
+
+Synthetic campaign: `--unique` distinct tracked links, repeated (and with
+shuffled query order / fragments) up to `--links`, with some casing drift and
+missing parameters mixed in.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.services.marketing_qa.utm_validator import validate_utm_batch, parse_utm
+
+
+def legacy_validate(url: str) -> dict:
+    params = parse_qs(urlparse(url).query)
+    required_utms = ['utm_source', 'utm_medium', 'utm_campaign']
+    found_utms = [p for p in required_utms if p in params]
+    return {"status": "pass" if len(found_utms) == len(required_utms) else "fail", "found": found_utms}
+
+
+def campaign_links(unique: int, total: int) -> list[str]:
+    sources = ["google", "Google", "facebook", "Facebook", "newsletter", "linkedin"]
+    mediums = ["cpc", "social", "email", "Social", "soical"]
+    base = []
+    for i in range(unique):
+        params = [f"utm_source={random.choice(sources)}", f"utm_medium={random.choice(mediums)}",
+                  f"utm_campaign=diwali_{i % 50}", f"utm_content=ad{i}"]
+        if random.random() < 0.05:
+            params.pop(random.randrange(3))
+        base.append((f"https://shop.example.com/p/{i % 500}", params))
+    links = []
+    for _ in range(total):
+        path, params = random.choice(base)
+        params = random.sample(params, len(params))
+        links.append(f"{path}?{'&'.join(params)}" + ("#top" if random.random() < 0.1 else ""))
+    return links
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--links", type=int, default=100_000)
+    parser.add_argument("--unique", type=int, default=20_000)
+    args = parser.parse_args()
+
+    random.seed(3)
+    links = campaign_links(args.unique, args.links)
+
+    start = time.perf_counter()
+    legacy = [legacy_validate(u) for u in links]
+    legacy_ms = (time.perf_counter() - start) * 1000
+
+    parse_utm.cache_clear()
+    start = time.perf_counter()
+    batch = validate_utm_batch(links)
+    cold_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    validate_utm_batch(links)
+    warm_ms = (time.perf_counter() - start) * 1000
+
+    details = batch["consistency"]["details"]
+    assert details["failed"] + details["passed"] == details["unique"]
+    legacy_failed = sum(1 for r in legacy if r["status"] == "fail")
+    print(f"{args.links} links, {details['unique']} distinct after normalization "
+          f"({details['failed']} failing; legacy counted {legacy_failed} failing links)")
+    print(f"legacy per-link loop   {legacy_ms:>8.1f} ms  (results only)")
+    print(f"batch, cold caches     {cold_ms:>8.1f} ms  (results + drift + unknown mediums)")
+    print(f"batch, warm caches     {warm_ms:>8.1f} ms")
+    print(f"drift: {details['casing_drift'].keys() and {k: len(v) for k, v in details['casing_drift'].items()}}, "
+          f"unknown mediums: {details['unknown_mediums']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""add test_cases.expected_output
+
+Revision ID: 3f8a1c6d2e94
+Revises: a6c1e8f4b209
+Create Date: 2026-10-18 16:21:07.514380
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8a1c6d2e94'
+down_revision = 'a6c1e8f4b209'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # what a passing answer must contain; cases without one finish as 'unverified'
+    op.add_column('test_cases', sa.Column('expected_output', sa.String(), nullable=True), schema='app')
+
+
+def downgrade():
+    op.drop_column('test_cases', 'expected_output', schema='app')
@@ -0,0 +1,37 @@
+"""add (created_at, id) keyset pagination indexes
+
+Built CONCURRENTLY so the multi-million-row qa_logs table stays writable
+while the index is created.
+
+Revision ID: 5c2f9e1d7a44
+Revises: beadea538ed9
+Create Date: 2026-10-18 10:02:17.518344
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2f9e1d7a44'
+down_revision = 'beadea538ed9'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_sankalpa_created_at_id": "sankalpa",
+    "ix_qa_logs_created_at_id": "qa_logs",
+    "ix_test_cases_created_at_id": "test_cases",
+}
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON app.{table} (created_at DESC, id DESC)")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS app.{name}")
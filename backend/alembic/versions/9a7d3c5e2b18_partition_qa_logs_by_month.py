@@ -0,0 +1,101 @@
+"""partition app.qa_logs by month
+
+Rebuilds app.qa_logs as a declarative RANGE (created_at) partitioned table:
+one partition per month from the oldest existing row through three months
+ahead, plus qa_logs_default as a safety net. The primary key becomes
+(id, created_at) because a partitioned table's unique constraints must
+include the partition key. Existing rows are copied across in this
+migration, so run it in a maintenance window on large tables; afterwards
+`python -m app.services.qa_log_partitions` keeps partitions created ahead
+and expires old ones.
+
+Revision ID: 9a7d3c5e2b18
+Revises: 5c2f9e1d7a44
+Create Date: 2026-10-18 10:41:53.207615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a7d3c5e2b18'
+down_revision = '5c2f9e1d7a44'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, agent_id, model, device, request_json, response_json, created_at"
+
+
+def upgrade():
+    op.execute("ALTER TABLE app.qa_logs RENAME TO qa_logs_legacy")
+    op.execute("ALTER TABLE app.qa_logs_legacy RENAME CONSTRAINT qa_logs_pkey TO qa_logs_legacy_pkey")
+    op.execute("ALTER INDEX IF EXISTS app.ix_qa_logs_created_at_id RENAME TO ix_qa_logs_legacy_created_at_id")
+
+    op.execute("""
+        CREATE TABLE app.qa_logs (
+            id uuid NOT NULL,
+            agent_id varchar(100),
+            model varchar(100),
+            device varchar(50),
+            request_json jsonb,
+            response_json jsonb,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT qa_logs_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("CREATE INDEX ix_qa_logs_created_at_id ON app.qa_logs (created_at DESC, id DESC)")
+    op.execute("CREATE TABLE app.qa_logs_default PARTITION OF app.qa_logs DEFAULT")
+    # same naming as app.services.qa_log_partitions: qa_logs_pYYYYMM, bounds in UTC
+    op.execute("""
+        DO $$
+        DECLARE
+            period date;
+        BEGIN
+            FOR period IN
+                SELECT generate_series(
+                    date_trunc('month', COALESCE((SELECT min(created_at) FROM app.qa_logs_legacy), now()) AT TIME ZONE 'UTC'),
+                    date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE app.%I PARTITION OF app.qa_logs FOR VALUES FROM (%L) TO (%L)',
+                    'qa_logs_p' || to_char(period, 'YYYYMM'),
+                    period::text || ' 00:00:00+00',
+                    (period + interval '1 month')::date::text || ' 00:00:00+00'
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute(f"""
+        INSERT INTO app.qa_logs ({COLUMNS})
+        SELECT id, agent_id, model, device, request_json, response_json, COALESCE(created_at, now())
+        FROM app.qa_logs_legacy
+    """)
+    op.execute("DROP TABLE app.qa_logs_legacy")
+    op.execute("ANALYZE app.qa_logs")
+
+
+def downgrade():
+    op.execute("ALTER TABLE app.qa_logs RENAME TO qa_logs_partitioned")
+    op.execute("ALTER TABLE app.qa_logs_partitioned RENAME CONSTRAINT qa_logs_pkey TO qa_logs_partitioned_pkey")
+    op.execute("ALTER INDEX app.ix_qa_logs_created_at_id RENAME TO ix_qa_logs_partitioned_created_at_id")
+    op.execute("""
+        CREATE TABLE app.qa_logs (
+            id uuid NOT NULL,
+            agent_id varchar(100),
+            model varchar(100),
+            device varchar(50),
+            request_json jsonb,
+            response_json jsonb,
+            created_at timestamptz DEFAULT now(),
+            CONSTRAINT qa_logs_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute(f"""
+        INSERT INTO app.qa_logs ({COLUMNS})
+        SELECT DISTINCT ON (id) {COLUMNS} FROM app.qa_logs_partitioned ORDER BY id, created_at
+    """)
+    op.execute("CREATE INDEX ix_qa_logs_created_at_id ON app.qa_logs (created_at DESC, id DESC)")
+    op.execute("DROP TABLE app.qa_logs_partitioned")
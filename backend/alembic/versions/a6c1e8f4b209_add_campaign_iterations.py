@@ -0,0 +1,63 @@
+"""add campaign_iterations (append-only marketing QA run history)
+
+One row per recorded /v1/marketing/qa/run. Per-URL check statuses are delta
+encoded against the previous run, with a full snapshot (keyframe) every
+N runs, so history grows by the change, never by rewriting a JSONB document.
+app.campaign_lineage's JSONB columns only carry a small latest-run summary.
+
+Revision ID: a6c1e8f4b209
+Revises: d81c6a3f0e27
+Create Date: 2026-10-18 16:02:37.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c1e8f4b209'
+down_revision = 'd81c6a3f0e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('campaign_iterations',
+    sa.Column('campaign_id', sa.UUID(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('run_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('trust_score', sa.SmallInteger(), nullable=False),
+    sa.Column('score_delta', sa.SmallInteger(), nullable=True),
+    sa.Column('urls', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('checks', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('by_check', postgresql.JSONB(astext_type=sa.Text()), server_default='{}', nullable=False),
+    sa.Column('snapshot', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('delta', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.ForeignKeyConstraint(['campaign_id'], ['app.campaign_lineage.campaign_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('campaign_id', 'seq'),
+    schema='app'
+    )
+    # time-series reads: one campaign's range of run_at, trust_score served from the index
+    op.create_index('ix_campaign_iterations_campaign_run_at', 'campaign_iterations', ['campaign_id', 'run_at'],
+                    unique=False, schema='app', postgresql_include=['trust_score'])
+    # history is append-only; rows only leave with their campaign (ON DELETE CASCADE)
+    op.execute("""
+        CREATE FUNCTION app.campaign_iterations_append_only() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            RAISE EXCEPTION 'app.campaign_iterations is append-only';
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER campaign_iterations_append_only BEFORE UPDATE ON app.campaign_iterations
+        FOR EACH ROW EXECUTE FUNCTION app.campaign_iterations_append_only()
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS campaign_iterations_append_only ON app.campaign_iterations")
+    op.execute("DROP FUNCTION IF EXISTS app.campaign_iterations_append_only()")
+    op.drop_index('ix_campaign_iterations_campaign_run_at', table_name='campaign_iterations', schema='app')
+    op.drop_table('campaign_iterations', schema='app')
@@ -0,0 +1,25 @@
+"""add qa_logs.cache_hit
+
+Revision ID: b7e2d94c1f35
+Revises: e4b1f0a6c953
+Create Date: 2026-10-18 12:04:39.882157
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d94c1f35'
+down_revision = 'e4b1f0a6c953'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # constant default: metadata-only on every partition, no table rewrite
+    op.add_column('qa_logs', sa.Column('cache_hit', sa.Boolean(), server_default=sa.text('false'), nullable=False), schema='app')
+
+
+def downgrade():
+    op.drop_column('qa_logs', 'cache_hit', schema='app')
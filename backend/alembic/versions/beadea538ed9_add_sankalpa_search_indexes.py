@@ -0,0 +1,40 @@
+"""add sankalpa full-text and trigram search indexes
+
+Also merges the campaign_lineage branch back into the main line so
+`alembic upgrade head` has a single head again.
+
+Revision ID: beadea538ed9
+Revises: f317549f7a90, add_campaign_lineage_table
+Create Date: 2026-10-18 09:12:41.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'beadea538ed9'
+down_revision = ('f317549f7a90', 'add_campaign_lineage_table')
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # 'simple' config: no stemming/stop words, so prefixes and non-English words match as typed
+    op.execute("""
+        ALTER TABLE app.sankalpa ADD COLUMN IF NOT EXISTS search_tsv tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple'::regconfig, coalesce(text, '')), 'A') ||
+            setweight(to_tsvector('simple'::regconfig, coalesce(context, '')), 'B')
+        ) STORED
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_sankalpa_search_tsv ON app.sankalpa USING gin (search_tsv)")
+    # serves ILIKE '%q%' substring search and word_similarity (<%) fuzzy search
+    op.execute("CREATE INDEX IF NOT EXISTS ix_sankalpa_text_trgm ON app.sankalpa USING gin (text gin_trgm_ops)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS app.ix_sankalpa_text_trgm")
+    op.execute("DROP INDEX IF EXISTS app.ix_sankalpa_search_tsv")
+    op.execute("ALTER TABLE app.sankalpa DROP COLUMN IF EXISTS search_tsv")
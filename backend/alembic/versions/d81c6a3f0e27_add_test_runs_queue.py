@@ -0,0 +1,62 @@
+"""add test_runs and test_run_items (SKIP LOCKED work queue)
+
+Revision ID: d81c6a3f0e27
+Revises: b7e2d94c1f35
+Create Date: 2026-10-18 12:47:15.406228
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81c6a3f0e27'
+down_revision = 'b7e2d94c1f35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('test_runs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.String(length=20), server_default='queued', nullable=False),
+    sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('completed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('passed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('failed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    schema='app'
+    )
+    op.create_table('test_run_items',
+    sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+    sa.Column('run_id', sa.UUID(), nullable=False),
+    sa.Column('test_case_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), server_default='queued', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('locked_by', sa.String(length=100), nullable=True),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('duration_ms', sa.Integer(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['run_id'], ['app.test_runs.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['test_case_id'], ['app.test_cases.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    schema='app'
+    )
+    # claim path: oldest queued items, SKIP LOCKED; stays small because finished items leave it
+    op.execute("CREATE INDEX ix_test_run_items_queued ON app.test_run_items (id) WHERE status = 'queued'")
+    # lease reaper
+    op.execute("CREATE INDEX ix_test_run_items_running ON app.test_run_items (locked_at) WHERE status = 'running'")
+    op.create_index('ix_test_run_items_run_status', 'test_run_items', ['run_id', 'status'], unique=False, schema='app')
+
+
+def downgrade():
+    op.drop_index('ix_test_run_items_run_status', table_name='test_run_items', schema='app')
+    op.execute("DROP INDEX IF EXISTS app.ix_test_run_items_running")
+    op.execute("DROP INDEX IF EXISTS app.ix_test_run_items_queued")
+    op.drop_table('test_run_items', schema='app')
+    op.drop_table('test_runs', schema='app')
@@ -0,0 +1,99 @@
+"""materialize request_lineage root, depth and path
+
+Every node carries its tree's root_lineage_id, its depth and its path
+(ancestor ids, root first, ending with itself), filled in by a BEFORE
+INSERT trigger from the parent row. A subtree is then one range scan on
+(root_lineage_id, timestamp) filtered by path position, instead of a
+WITH RECURSIVE walk over parent_lineage_id. Existing rows are backfilled.
+
+app.request_lineage itself is created by backend/migrations/003_lineage_and_contacts.sql.
+
+Revision ID: e4b1f0a6c953
+Revises: 9a7d3c5e2b18
+Create Date: 2026-10-18 11:20:06.734920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b1f0a6c953'
+down_revision = '9a7d3c5e2b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        ALTER TABLE app.request_lineage
+            ADD COLUMN IF NOT EXISTS root_lineage_id uuid,
+            ADD COLUMN IF NOT EXISTS depth integer,
+            ADD COLUMN IF NOT EXISTS path uuid[]
+    """)
+    # Parents must be inserted before (or earlier in the same statement than) their children:
+    # a row-level BEFORE trigger sees rows already processed by the same INSERT.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION app.request_lineage_set_path() RETURNS trigger AS $$
+        DECLARE
+            parent record;
+        BEGIN
+            IF NEW.parent_lineage_id IS NULL THEN
+                NEW.root_lineage_id := NEW.lineage_id;
+                NEW.depth := 0;
+                NEW.path := ARRAY[NEW.lineage_id];
+                RETURN NEW;
+            END IF;
+            SELECT root_lineage_id, depth, path INTO parent
+            FROM app.request_lineage WHERE lineage_id = NEW.parent_lineage_id;
+            IF NOT FOUND THEN
+                RAISE EXCEPTION 'parent lineage % must be inserted before child %', NEW.parent_lineage_id, NEW.lineage_id
+                    USING ERRCODE = 'foreign_key_violation';
+            END IF;
+            NEW.root_lineage_id := parent.root_lineage_id;
+            NEW.depth := parent.depth + 1;
+            NEW.path := parent.path || NEW.lineage_id;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER request_lineage_set_path
+        BEFORE INSERT ON app.request_lineage
+        FOR EACH ROW EXECUTE FUNCTION app.request_lineage_set_path()
+    """)
+    op.execute("""
+        WITH RECURSIVE tree AS (
+            SELECT lineage_id, lineage_id AS root_lineage_id, 0 AS depth, ARRAY[lineage_id] AS path
+            FROM app.request_lineage
+            WHERE parent_lineage_id IS NULL
+            UNION ALL
+            SELECT rl.lineage_id, t.root_lineage_id, t.depth + 1, t.path || rl.lineage_id
+            FROM app.request_lineage rl
+            JOIN tree t ON rl.parent_lineage_id = t.lineage_id
+        )
+        UPDATE app.request_lineage rl
+        SET root_lineage_id = t.root_lineage_id, depth = t.depth, path = t.path
+        FROM tree t
+        WHERE rl.lineage_id = t.lineage_id
+    """)
+    op.execute("""
+        ALTER TABLE app.request_lineage
+            ALTER COLUMN root_lineage_id SET NOT NULL,
+            ALTER COLUMN depth SET NOT NULL,
+            ALTER COLUMN path SET NOT NULL
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS idx_lineage_root_timestamp ON app.request_lineage (root_lineage_id, timestamp)")
+    op.execute("ANALYZE app.request_lineage")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS app.idx_lineage_root_timestamp")
+    op.execute("DROP TRIGGER IF EXISTS request_lineage_set_path ON app.request_lineage")
+    op.execute("DROP FUNCTION IF EXISTS app.request_lineage_set_path()")
+    op.execute("""
+        ALTER TABLE app.request_lineage
+            DROP COLUMN IF EXISTS path,
+            DROP COLUMN IF EXISTS depth,
+            DROP COLUMN IF EXISTS root_lineage_id
+    """)
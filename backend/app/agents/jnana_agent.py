@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import text as sql_text  # ← Rename to avoid conflict
-from typing import Dict, Any
+from typing import Dict, Any, List
+from collections import Counter
 from datetime import datetime
 import json
 import uuid
@@ -8,25 +9,35 @@ import uuid
 class JnanaAgent:
     """Validation agent with qa_logs integration"""
     
-    def __init__(self, db: Session, agent_id: str = "jnana-validator-v1"):
+    def __init__(self, db: Session, agent_id: str = "jnana-validator-v1", log_sink=None):
         self.db = db
         self.agent_id = agent_id
+        self.log_sink = log_sink  # QALogSink: write-behind instead of an INSERT in the caller's transaction
     
-    def validate_sankalpa(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
-        execution_id = str(uuid.uuid4())
+    @staticmethod
+    def check(text, context) -> List[str]:
         errors = []
-        
-        text = request_data.get("text", "")  # ← This was shadowing the import
         if not text:
             errors.append("Sankalpa text is required")
+        elif not isinstance(text, str):
+            errors.append("Sankalpa text must be a string")
         elif len(text) < 3:
             errors.append("Text too short (min 3 chars)")
         elif len(text) > 5000:
             errors.append("Text exceeds 5000 characters")
         
-        context = request_data.get("context", "")
-        if context and len(context) > 2000:
+        if context and not isinstance(context, str):
+            errors.append("Context must be a string")
+        elif context and len(context) > 2000:
             errors.append("Context exceeds 2000 characters")
+        return errors
+    
+    def validate_sankalpa(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        execution_id = str(uuid.uuid4())
+        
+        text = request_data.get("text", "")  # ← This was shadowing the import
+        context = request_data.get("context", "")
+        errors = self.check(text, context)
         
         result = {
             "valid": len(errors) == 0,
@@ -41,6 +52,12 @@ class JnanaAgent:
         }
         
         # Log to qa_logs
+        if self.log_sink is not None:
+            self.log_sink.submit_threadsafe(
+                self.log_sink.row(self.agent_id, request_data, result, id=execution_id)
+            )
+            return result
+
         log_query = sql_text("""
             INSERT INTO app.qa_logs (id, agent_id, request_json, response_json, created_at)
             VALUES (:id, :agent_id, CAST(:req AS jsonb), CAST(:resp AS jsonb), NOW())
@@ -53,3 +70,45 @@ class JnanaAgent:
         })
         
         return result
+    
+    def validate_many(self, items: List[Any]) -> Dict[str, Any]:
+        """One pass over a batch; logs a single aggregated qa_logs row instead of one per item"""
+        execution_id = str(uuid.uuid4())
+        results = []
+        error_counts = Counter()
+        for item in items:
+            if not isinstance(item, dict):
+                errors = ["Item must be an object with 'text'"]
+            else:
+                errors = self.check(item.get("text", ""), item.get("context", ""))
+            error_counts.update(errors)
+            results.append({"valid": not errors, "errors": errors})
+        
+        valid = sum(1 for r in results if r["valid"])
+        summary = {
+            "agent_id": self.agent_id,
+            "execution_id": execution_id,
+            "validated_at": datetime.utcnow().isoformat(),
+            "total": len(items),
+            "valid": valid,
+            "invalid": len(items) - valid,
+            "error_counts": dict(error_counts)
+        }
+        request_summary = {"batch_size": len(items)}
+        
+        if self.log_sink is not None:
+            self.log_sink.submit_threadsafe(
+                self.log_sink.row(self.agent_id, request_summary, summary, id=execution_id)
+            )
+        else:
+            self.db.execute(sql_text("""
+                INSERT INTO app.qa_logs (id, agent_id, request_json, response_json, created_at)
+                VALUES (:id, :agent_id, CAST(:req AS jsonb), CAST(:resp AS jsonb), NOW())
+            """), {
+                "id": execution_id,
+                "agent_id": self.agent_id,
+                "req": json.dumps(request_summary),
+                "resp": json.dumps(summary)
+            })
+        
+        return {"results": results, "metadata": summary}
@@ -0,0 +1,165 @@
+import importlib.util
+import logging
+import os
+import httpx
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class PoolStats:
+    """In-flight accounting for one upstream; a request counts until its body is closed"""
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.saturated = 0
+
+    def started(self):
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        if self.in_flight > self.max_connections:
+            self.saturated += 1
+
+    def finished(self):
+        self.in_flight -= 1
+
+
+class _MeteredStream(httpx.AsyncByteStream):
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close:
+                self._on_close()
+                self._on_close = None
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncHTTPTransport, stats: PoolStats):
+        self.transport = transport
+        self.stats = stats
+
+    async def handle_async_request(self, request):
+        self.stats.started()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception:
+            self.stats.errors += 1
+            self.stats.finished()
+            raise
+        response.stream = _MeteredStream(response.stream, self.stats.finished)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class HTTPClientRegistry:
+    """
+    One long-lived AsyncClient per upstream, opened and closed with the app.
+
+    Every setting can be passed to register() or overridden per upstream via
+    env, e.g. HTTP_INFERENCE_MAX_CONNECTIONS, HTTP_INFERENCE_HTTP2.
+    """
+
+    def __init__(self):
+        self._specs = {}
+        self._clients = {}
+        self._stats = {}
+
+    def register(self, name: str, base_url: str = "", *, max_connections: int = 100,
+                 max_keepalive: int = 20, keepalive_expiry: float = 30.0,
+                 connect_timeout: float = 5.0, timeout: float = 30.0, http2: bool = False):
+        env = f"HTTP_{name.upper()}_"
+        self._specs[name] = {
+            "base_url": base_url,
+            "max_connections": int(os.getenv(env + "MAX_CONNECTIONS", max_connections)),
+            "max_keepalive": int(os.getenv(env + "MAX_KEEPALIVE", max_keepalive)),
+            "keepalive_expiry": float(os.getenv(env + "KEEPALIVE_EXPIRY", keepalive_expiry)),
+            "connect_timeout": float(os.getenv(env + "CONNECT_TIMEOUT", connect_timeout)),
+            "timeout": float(os.getenv(env + "TIMEOUT", timeout)),
+            "http2": os.getenv(env + "HTTP2", "1" if http2 else "0") == "1",
+        }
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._build(name)
+        return client
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        spec = self._specs[name]
+        http2 = spec["http2"] and HTTP2_AVAILABLE
+        if spec["http2"] and not http2:
+            logger.warning(f"HTTP/2 requested for '{name}' but h2 is not installed; using HTTP/1.1")
+        limits = httpx.Limits(
+            max_connections=spec["max_connections"],
+            max_keepalive_connections=spec["max_keepalive"],
+            keepalive_expiry=spec["keepalive_expiry"],
+        )
+        stats = self._stats[name] = PoolStats(spec["max_connections"])
+        # http2 only takes effect when the upstream negotiates it (ALPN), otherwise HTTP/1.1
+        transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+        return httpx.AsyncClient(
+            base_url=spec["base_url"],
+            transport=MeteredTransport(transport, stats),
+            timeout=httpx.Timeout(spec["timeout"], connect=spec["connect_timeout"]),
+        )
+
+    async def open(self):
+        for name in self._specs:
+            self.get(name)
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def metrics(self) -> dict:
+        out = {}
+        for name, spec in self._specs.items():
+            stats = self._stats.get(name)
+            client = self._clients.get(name)
+            pool = getattr(getattr(getattr(client, "_transport", None), "transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            idle = sum(1 for c in connections if c.is_idle())
+            in_flight = stats.in_flight if stats else 0
+            out[name] = {
+                "base_url": spec["base_url"],
+                "max_connections": spec["max_connections"],
+                "http2": spec["http2"] and HTTP2_AVAILABLE,
+                "connections_open": len(connections),
+                "connections_idle": idle,
+                "in_flight": in_flight,
+                "queued": max(0, in_flight - spec["max_connections"]),
+                "saturation": round(in_flight / spec["max_connections"], 3),
+                "peak_in_flight": stats.peak_in_flight if stats else 0,
+                "saturated_requests": stats.saturated if stats else 0,
+                "requests": stats.requests if stats else 0,
+                "errors": stats.errors if stats else 0,
+            }
+        return out
+
+
+http_clients = HTTPClientRegistry()
+
+INFERENCE_URL = os.getenv("INFERENCE_URL", f"http://{os.getenv('AI_SERVICE_HOST', 'ai-inference')}:{os.getenv('AI_SERVICE_PORT', '8001')}")
+
+
+def register_inference():
+    """The inference upstream; shared by the API process and standalone test workers"""
+    http_clients.register("inference", INFERENCE_URL, max_connections=100, max_keepalive=50, timeout=60, http2=True)
@@ -0,0 +1,45 @@
+import base64
+import json
+import math
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException
+
+
+def encode_cursor(*key) -> str:
+    """Opaque cursor for the last row of a page; key is its sort key, e.g. (created_at, id)"""
+    values = [v.isoformat() if isinstance(v, datetime) else v if isinstance(v, (int, float)) or v is None else str(v)
+              for v in key]
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Inverse of encode_cursor; 400 on anything that did not come from us"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("wrong cursor size")
+        return values
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_timestamp(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_key(value, kind: type):
+    """One cursor component as `kind` (UUID -> canonical str, int, float); 400 like any other bad cursor"""
+    try:
+        if kind is UUID:
+            return str(UUID(value))
+        if isinstance(value, bool) or not isinstance(value, int if kind is int else (int, float)):
+            raise TypeError
+        if not math.isfinite(value):
+            raise ValueError
+        return kind(value)
+    except (TypeError, ValueError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -1,9 +1,19 @@
 import redis
+import redis.asyncio
 from .config import settings
 
-def get_redis():
+def get_redis(**kwargs):
+    options = {"decode_responses": True, **kwargs}
     return redis.Redis(
         host=settings.VALKEY_HOST,
         port=settings.VALKEY_PORT,
-        decode_responses=True
+        **options
+    )
+
+def get_async_redis(**kwargs):
+    options = {"decode_responses": True, **kwargs}
+    return redis.asyncio.Redis(
+        host=settings.VALKEY_HOST,
+        port=settings.VALKEY_PORT,
+        **options
     )
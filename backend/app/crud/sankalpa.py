@@ -0,0 +1,146 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import uuid4
+import json
+
+# One data-modifying CTE = one round trip for the whole create:
+# contact (response already computed), every lineage node, and the sankalpa row.
+# Lineage rows arrive as one JSON array so parent and children go in a single INSERT;
+# the self-referencing FK is checked at end of statement, after all rows exist.
+CREATE_SANKALPA_QUERY = text("""
+    WITH contact AS (
+        INSERT INTO app.sacred_contacts
+        (contact_id, request_payload, api_endpoint, timestamp, response_payload, status_code)
+        VALUES (CAST(:contact_id AS uuid), CAST(:request AS jsonb), :endpoint, NOW(),
+                CAST(:response AS jsonb), :status)
+    ),
+    lineage AS (
+        INSERT INTO app.request_lineage
+        (lineage_id, parent_lineage_id, agent_name, operation_type, metadata, duration_ms, success)
+        SELECT lineage_id, parent_lineage_id, agent_name, operation_type, metadata, duration_ms, success
+        FROM jsonb_to_recordset(CAST(:lineage AS jsonb)) AS l(
+            lineage_id uuid, parent_lineage_id uuid, agent_name text, operation_type text,
+            metadata jsonb, duration_ms int, success boolean
+        )
+    ),
+    sankalpa AS (
+        INSERT INTO app.sankalpa (id, text, context, created_at)
+        SELECT CAST(:id AS uuid), :text, :context, NOW()
+        WHERE :valid
+        RETURNING id, text, context, created_at
+    )
+    SELECT id, text, context, created_at FROM sankalpa
+""")
+
+
+def lineage_node(lineage_id, parent, agent, op, meta, duration_ms=None, success=True) -> dict:
+    return {
+        "lineage_id": lineage_id, "parent_lineage_id": parent, "agent_name": agent,
+        "operation_type": op, "metadata": meta, "duration_ms": duration_ms, "success": success
+    }
+
+
+def create_sankalpa_single_trip(db: Session, text_: str, context, validation: dict, validation_ms: int,
+                                endpoint: str = "/sankalpa") -> dict:
+    """
+    Write contact, lineage and (when valid) the sankalpa in one statement.
+    Returns {"lineage_id", "row"}; row is None when validation failed. Caller commits.
+    """
+    contact_id = str(uuid4())
+    root_lineage_id = str(uuid4())
+    sankalpa_id = str(uuid4())
+
+    lineage = [
+        lineage_node(root_lineage_id, None, "api-gateway", "sankalpa_create", {"contact_id": contact_id}),
+        lineage_node(str(uuid4()), root_lineage_id, "jnana-validator-v1", "validate_sankalpa",
+                     validation["metadata"], validation_ms, validation["valid"]),
+    ]
+    if validation["valid"]:
+        lineage.append(lineage_node(str(uuid4()), root_lineage_id, "db-writer", "insert_sankalpa",
+                                    {"sankalpa_id": sankalpa_id}))
+        response, status = {"id": sankalpa_id, "lineage_id": root_lineage_id, "status": "created"}, 201
+    else:
+        response = {"errors": validation["errors"], "lineage_id": root_lineage_id, "status": "validation_failed"}
+        status = 400
+
+    row = db.execute(CREATE_SANKALPA_QUERY, {
+        "contact_id": contact_id,
+        "request": json.dumps({"text": text_, "context": context}),
+        "endpoint": endpoint,
+        "response": json.dumps(response),
+        "status": status,
+        "lineage": json.dumps(lineage),
+        "id": sankalpa_id,
+        "text": text_,
+        "context": context,
+        "valid": validation["valid"],
+    }).fetchone()
+    return {"lineage_id": root_lineage_id, "row": row}
+
+
+# Bulk path: rows travel as parallel arrays, so a chunk is one INSERT regardless of size
+BULK_INSERT_QUERY = text("""
+    INSERT INTO app.sankalpa (id, text, context, created_at)
+    SELECT t.id, t.text, t.context, NOW()
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:texts AS text[]), CAST(:contexts AS text[])) AS t(id, text, context)
+""")
+
+# Contact + a whole lineage tree in one statement (same jsonb_to_recordset shape as above)
+RECORD_REQUEST_QUERY = text("""
+    WITH contact AS (
+        INSERT INTO app.sacred_contacts
+        (contact_id, request_payload, api_endpoint, timestamp, response_payload, status_code)
+        VALUES (CAST(:contact_id AS uuid), CAST(:request AS jsonb), :endpoint, NOW(),
+                CAST(:response AS jsonb), :status)
+    )
+    INSERT INTO app.request_lineage
+    (lineage_id, parent_lineage_id, agent_name, operation_type, metadata, duration_ms, success)
+    SELECT lineage_id, parent_lineage_id, agent_name, operation_type, metadata, duration_ms, success
+    FROM jsonb_to_recordset(CAST(:lineage AS jsonb)) AS l(
+        lineage_id uuid, parent_lineage_id uuid, agent_name text, operation_type text,
+        metadata jsonb, duration_ms int, success boolean
+    )
+""")
+
+
+def _bulk_params(rows: list) -> dict:
+    return {
+        "ids": [r["id"] for r in rows],
+        "texts": [r["text"] for r in rows],
+        "contexts": [r["context"] for r in rows],
+    }
+
+
+async def bulk_insert_sankalpa(db: AsyncSession, rows: list, chunk_size: int = 1000) -> dict:
+    """
+    Insert rows ({"index", "id", "text", "context"}) chunk by chunk, each chunk
+    under a savepoint. A failing chunk is retried row by row so one bad row
+    only fails itself. Returns {index: error} for rows that were not inserted.
+    """
+    failures = {}
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        try:
+            async with db.begin_nested():
+                await db.execute(BULK_INSERT_QUERY, _bulk_params(chunk))
+        except Exception:
+            for row in chunk:
+                try:
+                    async with db.begin_nested():
+                        await db.execute(BULK_INSERT_QUERY, _bulk_params([row]))
+                except Exception as e:
+                    failures[row["index"]] = str(getattr(e, "orig", e))
+    return failures
+
+
+async def record_request(db: AsyncSession, endpoint: str, request: dict, response: dict, status: int,
+                         lineage: list, contact_id: str = None):
+    await db.execute(RECORD_REQUEST_QUERY, {
+        "contact_id": contact_id or str(uuid4()),
+        "request": json.dumps(request),
+        "endpoint": endpoint,
+        "response": json.dumps(response),
+        "status": status,
+        "lineage": json.dumps(lineage),
+    })
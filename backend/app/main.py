@@ -1,14 +1,25 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional
 from uuid import uuid4, UUID
 from datetime import datetime
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
-import httpx, os, json
+from sqlalchemy.ext.asyncio import AsyncSession
+import httpx, os, json, re, time
 import logging
 
+from app.core.http import http_clients, register_inference
+from app.core.pagination import encode_cursor, decode_cursor, parse_key, parse_timestamp
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.services.qa_log_sink import qa_log_sink
+from app.services.read_cache import read_cache
+from app.services.qa_result_cache import qa_result_cache
+from app.services.test_runner import TestRunner, create_run, run_progress
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -26,43 +37,71 @@ app = FastAPI(title="Sacred QA Backend")
 # Store inference capabilities
 app.inference_capabilities = None
 
+register_inference()
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+@app.on_event("startup")
+async def open_http_clients():
+    await http_clients.open()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await http_clients.aclose()
+
+@app.on_event("startup")
+async def start_qa_log_sink():
+    await qa_log_sink.start()
+
+@app.on_event("shutdown")
+async def drain_qa_log_sink():
+    await qa_log_sink.stop()
+
+# In-process test worker; standalone workers: python -m app.services.test_runner
+test_runner = TestRunner.from_env() if os.getenv("TEST_RUNNER_EMBEDDED", "1") == "1" else None
+
+@app.on_event("startup")
+async def start_test_runner():
+    if test_runner:
+        test_runner.start()
+
+@app.on_event("shutdown")
+async def stop_test_runner():
+    if test_runner:
+        await test_runner.stop()
+
 @app.on_event("startup")
 async def harvest_vcv():
     """Gate 2: Harvest VCV from inference service on startup"""
-    inference_url = os.getenv("INFERENCE_URL", f"http://{os.getenv('AI_SERVICE_HOST', 'ai-inference')}:{os.getenv('AI_SERVICE_PORT', '8001')}")
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(f"{inference_url}/vcv")
-            response.raise_for_status()
-            vcv_data = response.json()
+        response = await http_clients.get("inference").get("/vcv", timeout=10)
+        response.raise_for_status()
+        vcv_data = response.json()
 
-            # Store in app state
-            app.inference_capabilities = vcv_data
+        # Store in app state
+        app.inference_capabilities = vcv_data
+        await qa_result_cache.set_model(vcv_data)
 
-            # Persist to database
-            db = SessionLocal()
-            try:
-                vcv_query = text("""
-                    INSERT INTO app.inference_capabilities
-                    (id, vcv_data, harvested_at)
-                    VALUES (:id, CAST(:vcv_data AS jsonb), NOW())
-                """)
-                db.execute(vcv_query, {
-                    "id": str(uuid4()),
-                    "vcv_data": json.dumps(vcv_data)
-                })
-                db.commit()
-                logger.info(f"✅ VCV harvested: {vcv_data.get('device', 'unknown')}")
-            finally:
-                db.close()
+        # Persist to database
+        async with AsyncSessionLocal() as db:
+            vcv_query = text("""
+                INSERT INTO app.inference_capabilities
+                (id, vcv_data, harvested_at)
+                VALUES (:id, CAST(:vcv_data AS jsonb), NOW())
+            """)
+            await db.execute(vcv_query, {
+                "id": str(uuid4()),
+                "vcv_data": json.dumps(vcv_data)
+            })
+            await db.commit()
+            logger.info(f"✅ VCV harvested: {vcv_data.get('device', 'unknown')}")
 
     except Exception as e:
         logger.warning(f"⚠️  Could not harvest VCV: {e}")
@@ -71,6 +110,12 @@ async def harvest_vcv():
 def health():
     return {"status":"healthy","service":"backend"}
 
+@app.get("/metrics")
+def metrics():
+    return {"http_pools": http_clients.metrics(), "qa_log_sink": qa_log_sink.metrics(), "read_cache": read_cache.metrics(),
+            "qa_result_cache": qa_result_cache.metrics(),
+            "test_runner": test_runner.metrics() if test_runner else None}
+
 class SankalpaCreate(BaseModel):
     text: str
     context: Optional[str] = None
@@ -81,131 +126,31 @@ class SankalpaResponse(BaseModel):
     context: Optional[str]
     created_at: datetime
 
-# CREATE - with lineage tracking
+# CREATE - with lineage tracking (single round trip, see app/crud/sankalpa.py)
 @app.post("/sankalpa", response_model=SankalpaResponse)
 def create_sankalpa(body: SankalpaCreate, db: Session = Depends(get_db)):
     from app.agents.jnana_agent import JnanaAgent
+    from app.crud.sankalpa import create_sankalpa_single_trip
     from datetime import datetime
-    
-    # Generate IDs
-    contact_id = str(uuid4())
-    root_lineage_id = str(uuid4())
-    sankalpa_id = str(uuid4())
-    
-    # 1. Log sacred contact (API request)
-    contact_query = text("""
-        INSERT INTO app.sacred_contacts 
-        (contact_id, request_payload, api_endpoint, timestamp)
-        VALUES (:id, CAST(:payload AS jsonb), :endpoint, NOW())
-    """)
-    db.execute(contact_query, {
-        "id": contact_id,
-        "payload": json.dumps({"text": body.text, "context": body.context}),
-        "endpoint": "/sankalpa"
-    })
-    
-    # 2. Create root lineage entry
-    root_lineage_query = text("""
-        INSERT INTO app.request_lineage 
-        (lineage_id, agent_name, operation_type, metadata)
-        VALUES (:id, :agent, :op, CAST(:meta AS jsonb))
-    """)
-    db.execute(root_lineage_query, {
-        "id": root_lineage_id,
-        "agent": "api-gateway",
-        "op": "sankalpa_create",
-        "meta": json.dumps({"contact_id": contact_id})
-    })
-    
-    # 3. Run JnanaAgent validation
-    agent = JnanaAgent(db)
+
+    # 1. Run JnanaAgent validation (pure Python; its qa_logs row goes to the sink)
+    agent = JnanaAgent(db, log_sink=qa_log_sink)
     validation_start = datetime.utcnow()
     validation = agent.validate_sankalpa({"text": body.text, "context": body.context})
     validation_duration = int((datetime.utcnow() - validation_start).total_seconds() * 1000)
-    
-    # 4. Log validation in lineage
-    validation_lineage_query = text("""
-        INSERT INTO app.request_lineage 
-        (lineage_id, parent_lineage_id, agent_name, operation_type, metadata, duration_ms, success)
-        VALUES (:id, :parent, :agent, :op, CAST(:meta AS jsonb), :duration, :success)
-    """)
-    db.execute(validation_lineage_query, {
-        "id": str(uuid4()),
-        "parent": root_lineage_id,
-        "agent": "jnana-validator-v1",
-        "op": "validate_sankalpa",
-        "meta": json.dumps(validation["metadata"]),
-        "duration": validation_duration,
-        "success": validation["valid"]
-    })
-    
-    # 5. Return error if validation failed
+
+    # 2. Contact + lineage tree + sankalpa in one statement
+    created = create_sankalpa_single_trip(db, body.text, body.context, validation, validation_duration)
+    db.commit()
+
+    # 3. Return error if validation failed
     if not validation["valid"]:
-        # Update contact with error response
-        error_response_query = text("""
-            UPDATE app.sacred_contacts 
-            SET response_payload = CAST(:response AS jsonb), status_code = :status
-            WHERE contact_id = :id
-        """)
-        db.execute(error_response_query, {
-            "id": contact_id,
-            "response": json.dumps({
-                "errors": validation["errors"],
-                "lineage_id": root_lineage_id,
-                "status": "validation_failed"
-            }),
-            "status": 400
-        })
-        db.commit()
         raise HTTPException(
             status_code=400, 
-            detail={"errors": validation["errors"], "lineage_id": root_lineage_id}
+            detail={"errors": validation["errors"], "lineage_id": created["lineage_id"]}
         )
-    
-    # 6. Insert sankalpa
-    sankalpa_query = text("""
-        INSERT INTO app.sankalpa (id, text, context, created_at)
-        VALUES (:id, :text, :context, NOW())
-        RETURNING id, text, context, created_at
-    """)
-    row = db.execute(sankalpa_query, {
-        "id": sankalpa_id,
-        "text": body.text,
-        "context": body.context
-    }).fetchone()
-    
-    # 7. Log sankalpa creation in lineage
-    insert_lineage_query = text("""
-        INSERT INTO app.request_lineage 
-        (lineage_id, parent_lineage_id, agent_name, operation_type, metadata)
-        VALUES (:id, :parent, :agent, :op, CAST(:meta AS jsonb))
-    """)
-    db.execute(insert_lineage_query, {
-        "id": str(uuid4()),
-        "parent": root_lineage_id,
-        "agent": "db-writer",
-        "op": "insert_sankalpa",
-        "meta": json.dumps({"sankalpa_id": sankalpa_id})
-    })
-    
-    # 8. Update contact with response
-    update_contact_query = text("""
-        UPDATE app.sacred_contacts 
-        SET response_payload = CAST(:response AS jsonb), status_code = :status
-        WHERE contact_id = :id
-    """)
-    db.execute(update_contact_query, {
-        "id": contact_id,
-        "response": json.dumps({
-            "id": sankalpa_id,
-            "lineage_id": root_lineage_id,
-            "status": "created"
-        }),
-        "status": 201
-    })
-    
-    db.commit()
-    
+
+    row = created["row"]
     return {
         "id": row[0], 
         "text": row[1], 
@@ -213,27 +158,204 @@ def create_sankalpa(body: SankalpaCreate, db: Session = Depends(get_db)):
         "created_at": row[3]
     }
 
-# LIST - new
-@app.get("/sankalpa")
-def list_sankalpa(q: Optional[str] = None, limit: int = 100, db: Session = Depends(get_db)):
-    """List sankalpas with optional text search"""
-    if q:
-        query = text("""
-            SELECT id, text, context, status, created_at 
-            FROM app.sankalpa 
-            WHERE text ILIKE :search
-            ORDER BY created_at DESC 
-            LIMIT :limit
+SANKALPA_BULK_MAX_ITEMS = int(os.getenv("SANKALPA_BULK_MAX_ITEMS", "50000"))
+
+def parse_bulk_body(raw: bytes, content_type: str):
+    """JSON array or NDJSON -> (items, {index: parse error}, format); a bad NDJSON line only fails itself"""
+    if "ndjson" not in content_type and raw.lstrip()[:1] == b"[":
+        try:
+            items = json.loads(raw)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON array: {e}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array")
+        return items, {}, "json"
+    items, parse_errors = [], {}
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError as e:
+            parse_errors[len(items)] = f"Invalid JSON line: {e}"
+            items.append(None)
+    return items, parse_errors, "ndjson"
+
+# BULK CREATE - JSON array or NDJSON, per-item results
+@app.post("/sankalpa/bulk")
+async def bulk_create_sankalpa(request: Request, db: AsyncSession = Depends(get_async_db)):
+    from app.agents.jnana_agent import JnanaAgent
+    from app.crud.sankalpa import bulk_insert_sankalpa, record_request, lineage_node
+
+    items, parse_errors, body_format = parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    if len(items) > SANKALPA_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {SANKALPA_BULK_MAX_ITEMS} items")
+
+    contact_id = str(uuid4())
+    root_lineage_id = str(uuid4())
+
+    # 1. Validate the whole batch in one pass (one aggregated qa_logs row)
+    agent = JnanaAgent(None, log_sink=qa_log_sink)
+    started = time.perf_counter()
+    validation = await run_in_threadpool(agent.validate_many, items)
+    validation_ms = int((time.perf_counter() - started) * 1000)
+
+    results, rows = [], []
+    for i, (item, check) in enumerate(zip(items, validation["results"])):
+        if i in parse_errors:
+            results.append({"index": i, "status": "invalid", "errors": [parse_errors[i]]})
+        elif not check["valid"]:
+            results.append({"index": i, "status": "invalid", "errors": check["errors"]})
+        else:
+            row = {"index": i, "id": str(uuid4()), "text": item["text"], "context": item.get("context")}
+            rows.append(row)
+            results.append({"index": i, "status": "created", "id": row["id"]})
+
+    # 2. Multi-row inserts; failures stay per item
+    started = time.perf_counter()
+    failures = await bulk_insert_sankalpa(db, rows)
+    insert_ms = int((time.perf_counter() - started) * 1000)
+    for index, error in failures.items():
+        results[index] = {"index": index, "status": "error", "error": error}
+
+    created = len(rows) - len(failures)
+    summary = {
+        "lineage_id": root_lineage_id,
+        "total": len(items),
+        "created": created,
+        "invalid": len(items) - len(rows),
+        "failed": len(failures)
+    }
+
+    # 3. One parent lineage node + aggregated children, with the contact, in one statement
+    await record_request(
+        db, "/sankalpa/bulk",
+        {"items": len(items), "format": body_format},
+        {**summary, "status": "created" if created else "no_rows_created"},
+        201 if created else 400,
+        [
+            lineage_node(root_lineage_id, None, "api-gateway", "sankalpa_bulk_create", {"contact_id": contact_id, "items": len(items)}),
+            lineage_node(str(uuid4()), root_lineage_id, "jnana-validator-v1", "validate_sankalpa_batch",
+                         validation["metadata"], validation_ms, summary["invalid"] == 0),
+            lineage_node(str(uuid4()), root_lineage_id, "db-writer", "insert_sankalpa_batch",
+                         {"inserted": created, "failed": len(failures)}, insert_ms, not failures),
+        ],
+        contact_id=contact_id,
+    )
+    await db.commit()
+
+    return {**summary, "results": results}
+
+# SEARCH - full-text (tsvector + GIN), fuzzy (pg_trgm) or substring (trigram-indexed ILIKE)
+SEARCH_MODES = ("fts", "trigram", "substring")
+
+def prefix_tsquery(q: str, prefix: bool) -> str:
+    """Terms AND-ed together; only \\w+ tokens survive, so user input cannot inject tsquery operators"""
+    terms = re.findall(r"\w+", q.lower())
+    return " & ".join(f"{t}:*" if prefix else t for t in terms)
+
+def keyset_after(cursor: Optional[str], with_rank: bool = False, id_type: type = UUID,
+                 nullable_created_at: bool = False) -> dict:
+    """
+    Decode a cursor into bind params for `(…, created_at, id) < (…)`; {} for the first page.
+    Every component is type-checked (id as `id_type`, rank as float), so a forged cursor is
+    a 400 rather than a cast error. With nullable_created_at, after_created_at may be None.
+    """
+    if not cursor:
+        return {}
+    values = decode_cursor(cursor, 3 if with_rank else 2)
+    created_at = values[-2]
+    params = {
+        "after_created_at": None if nullable_created_at and created_at is None else parse_timestamp(created_at),
+        "after_id": parse_key(values[-1], id_type),
+    }
+    if with_rank:
+        params["after_rank"] = parse_key(values[0], float)
+    return params
+
+def set_next_cursor(response: Response, rows: list, limit: int, key) -> list:
+    """rows were fetched with limit + 1; the extra row only says another page exists"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(*key(rows[-1]))
+    return rows
+
+def search_sankalpa(db: Session, q: str, mode: str, prefix: bool, limit: int, after: dict):
+    """Ranked modes page on (rank, created_at, id), substring on (created_at, id); fetches limit + 1"""
+    if mode == "fts":
+        tsq = prefix_tsquery(q, prefix)
+        if not tsq:
+            return []
+        keyset = """AND (ts_rank_cd(search_tsv, query), created_at, id)
+                    < (CAST(:after_rank AS real), :after_created_at, CAST(:after_id AS uuid))""" if after else ""
+        query = text(f"""
+            WITH hits AS (
+                SELECT id, text, context, status, created_at, ts_rank_cd(search_tsv, query) AS rank
+                FROM app.sankalpa, to_tsquery('simple', :tsq) AS query
+                WHERE search_tsv @@ query {keyset}
+                ORDER BY rank DESC, created_at DESC, id DESC
+                LIMIT :limit
+            )
+            SELECT id, text, context, status, created_at, rank,
+                   ts_headline('simple', text, to_tsquery('simple', :tsq),
+                               'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15') AS highlight
+            FROM hits
+            ORDER BY rank DESC, created_at DESC, id DESC
         """)
-        rows = db.execute(query, {"search": f"%{q}%", "limit": limit}).fetchall()
-    else:
-        query = text("""
-            SELECT id, text, context, status, created_at 
-            FROM app.sankalpa 
-            ORDER BY created_at DESC 
+        return db.execute(query, {"tsq": tsq, "limit": limit + 1, **after}).fetchall()
+    if mode == "trigram":
+        keyset = """AND (word_similarity(:q, text), created_at, id)
+                    < (CAST(:after_rank AS real), :after_created_at, CAST(:after_id AS uuid))""" if after else ""
+        query = text(f"""
+            SELECT id, text, context, status, created_at, word_similarity(:q, text) AS rank, NULL AS highlight
+            FROM app.sankalpa
+            WHERE :q <% text {keyset}
+            ORDER BY rank DESC, created_at DESC, id DESC
             LIMIT :limit
         """)
-        rows = db.execute(query, {"limit": limit}).fetchall()
+        return db.execute(query, {"q": q, "limit": limit + 1, **after}).fetchall()
+    keyset = "AND (created_at, id) < (:after_created_at, CAST(:after_id AS uuid))" if after else ""
+    query = text(f"""
+        SELECT id, text, context, status, created_at, NULL AS rank, NULL AS highlight
+        FROM app.sankalpa 
+        WHERE text ILIKE :search {keyset}
+        ORDER BY created_at DESC, id DESC
+        LIMIT :limit
+    """)
+    return db.execute(query, {"search": f"%{q}%", "limit": limit + 1, **after}).fetchall()
+
+# LIST - new
+@app.get("/sankalpa")
+def list_sankalpa(response: Response, q: Optional[str] = None, mode: str = "fts", prefix: bool = True,
+                  limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    List sankalpas newest first; with q, ranked search (mode=fts|trigram|substring) with highlights.
+    Keyset-paginated: pass the X-Next-Cursor response header back as `cursor` for the next page.
+    """
+    if q:
+        if mode not in SEARCH_MODES:
+            raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(SEARCH_MODES)}")
+        ranked = mode != "substring"
+        rows = search_sankalpa(db, q, mode, prefix, limit, keyset_after(cursor, with_rank=ranked))
+        rows = set_next_cursor(response, rows, limit,
+                               lambda r: (r[5], r[4], r[0]) if ranked else (r[4], r[0]))
+        return [
+            {"id": r[0], "text": r[1], "context": r[2], "status": r[3], "created_at": r[4],
+             "rank": r[5], "highlight": r[6]}
+            for r in rows
+        ]
+
+    after = keyset_after(cursor)
+    keyset = "WHERE (created_at, id) < (:after_created_at, CAST(:after_id AS uuid))" if after else ""
+    query = text(f"""
+        SELECT id, text, context, status, created_at 
+        FROM app.sankalpa 
+        {keyset}
+        ORDER BY created_at DESC, id DESC
+        LIMIT :limit
+    """)
+    rows = db.execute(query, {"limit": limit + 1, **after}).fetchall()
+    rows = set_next_cursor(response, rows, limit, lambda r: (r[4], r[0]))
     
     return [
         {"id": r[0], "text": r[1], "context": r[2], "status": r[3], "created_at": r[4]}
@@ -243,20 +365,25 @@ def list_sankalpa(q: Optional[str] = None, limit: int = 100, db: Session = Depen
 # READ - new
 @app.get("/sankalpa/{sid}")
 def get_sankalpa(sid: UUID, db: Session = Depends(get_db)):
-    """Get single sankalpa by ID"""
-    query = text("""
-        SELECT id, text, context, status, is_active, created_at, updated_at, completed_at
-        FROM app.sankalpa 
-        WHERE id = :sid
-    """)
-    row = db.execute(query, {"sid": str(sid)}).fetchone()
-    if not row:
+    """Get single sankalpa by ID (read-through Valkey cache, invalidated by PATCH/DELETE)"""
+    def load():
+        query = text("""
+            SELECT id, text, context, status, is_active, created_at, updated_at, completed_at
+            FROM app.sankalpa 
+            WHERE id = :sid
+        """)
+        row = db.execute(query, {"sid": str(sid)}).fetchone()
+        if not row:
+            return None
+        return {
+            "id": row[0], "text": row[1], "context": row[2], "status": row[3],
+            "is_active": row[4], "created_at": row[5], "updated_at": row[6], "completed_at": row[7]
+        }
+
+    sankalpa = read_cache.get_or_load("sankalpa", str(sid), load)
+    if sankalpa is None:
         raise HTTPException(status_code=404, detail="Sankalpa not found")
-    
-    return {
-        "id": row[0], "text": row[1], "context": row[2], "status": row[3],
-        "is_active": row[4], "created_at": row[5], "updated_at": row[6], "completed_at": row[7]
-    }
+    return sankalpa
 
 # UPDATE - new
 @app.patch("/sankalpa/{sid}")
@@ -293,6 +420,7 @@ def update_sankalpa(sid: UUID, body: dict, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Sankalpa not found")
     
     db.commit()
+    read_cache.invalidate("sankalpa", str(sid))
     return {"id": row[0], "text": row[1], "context": row[2], "status": row[3], "created_at": row[4]}
 
 # DELETE - new
@@ -304,67 +432,73 @@ def delete_sankalpa(sid: UUID, db: Session = Depends(get_db)):
     if not row:
         raise HTTPException(status_code=404, detail="Sankalpa not found")
     db.commit()
+    read_cache.invalidate("sankalpa", str(sid))
     return {"ok": True, "deleted_id": row[0]}
 
 
 # LINEAGE - new
 @app.get("/lineage/{lineage_id}")
 def get_lineage_tree(lineage_id: UUID, db: Session = Depends(get_db)):
-    """Get full lineage tree for a request"""
-    query = text("""
-        WITH RECURSIVE lineage_tree AS (
-            -- Base case: get the root node
-            SELECT lineage_id, parent_lineage_id, agent_name, operation_type,
-                   timestamp, metadata, duration_ms, success, 0 as depth
-            FROM app.request_lineage
-            WHERE lineage_id = :lineage_id
-            
-            UNION ALL
-            
-            -- Recursive case: get all children
+    """Get full lineage tree for a request (the subtree under lineage_id)"""
+    # trees are written in one statement and never change afterwards: cached for CACHE_LINEAGE_TTL
+    def load():
+        # root/depth/path are materialized at insert time: one range scan on (root_lineage_id, timestamp),
+        # keeping the nodes whose path passes through the requested node
+        query = text("""
             SELECT rl.lineage_id, rl.parent_lineage_id, rl.agent_name, rl.operation_type,
-                   rl.timestamp, rl.metadata, rl.duration_ms, rl.success, lt.depth + 1
-            FROM app.request_lineage rl
-            INNER JOIN lineage_tree lt ON rl.parent_lineage_id = lt.lineage_id
-        )
-        SELECT * FROM lineage_tree ORDER BY timestamp
-    """)
+                   rl.timestamp, rl.metadata, rl.duration_ms, rl.success, rl.depth - node.depth AS depth
+            FROM app.request_lineage node
+            JOIN app.request_lineage rl
+              ON rl.root_lineage_id = node.root_lineage_id
+             AND rl.path[node.depth + 1] = node.lineage_id
+            WHERE node.lineage_id = :lineage_id
+            ORDER BY rl.timestamp
+        """)
     
-    rows = db.execute(query, {"lineage_id": str(lineage_id)}).fetchall()
+        rows = db.execute(query, {"lineage_id": str(lineage_id)}).fetchall()
     
-    if not rows:
-        raise HTTPException(status_code=404, detail="Lineage not found")
+        if not rows:
+            return None
     
-    return {
-        "lineage_id": str(lineage_id),
-        "total_operations": len(rows),
-        "tree": [
-            {
-                "lineage_id": str(r[0]),
-                "parent_lineage_id": str(r[1]) if r[1] else None,
-                "agent_name": r[2],
-                "operation_type": r[3],
-                "timestamp": str(r[4]),
-                "metadata": r[5],
-                "duration_ms": r[6],
-                "success": r[7],
-                "depth": r[8]
-            }
-            for r in rows
-        ]
-    }
+        return {
+            "lineage_id": str(lineage_id),
+            "total_operations": len(rows),
+            "tree": [
+                {
+                    "lineage_id": str(r[0]),
+                    "parent_lineage_id": str(r[1]) if r[1] else None,
+                    "agent_name": r[2],
+                    "operation_type": r[3],
+                    "timestamp": str(r[4]),
+                    "metadata": r[5],
+                    "duration_ms": r[6],
+                    "success": r[7],
+                    "depth": r[8]
+                }
+                for r in rows
+            ]
+        }
+
+    tree = read_cache.get_or_load("lineage", str(lineage_id), load)
+    if tree is None:
+        raise HTTPException(status_code=404, detail="Lineage not found")
+    return tree
 
 # QA LOGS LIST - new
 @app.get("/qa_logs")
-def list_qa_logs(limit: int = 50, db: Session = Depends(get_db)):
-    """List recent QA logs"""
-    query = text("""
+def list_qa_logs(response: Response, limit: int = 50, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    """List recent QA logs; keyset-paginated via `cursor` / X-Next-Cursor"""
+    after = keyset_after(cursor)
+    keyset = "WHERE (created_at, id) < (:after_created_at, CAST(:after_id AS uuid))" if after else ""
+    query = text(f"""
         SELECT id, agent_id, model, device, request_json, response_json, created_at
         FROM app.qa_logs
-        ORDER BY created_at DESC
+        {keyset}
+        ORDER BY created_at DESC, id DESC
         LIMIT :limit
     """)
-    rows = db.execute(query, {"limit": limit}).fetchall()
+    rows = db.execute(query, {"limit": limit + 1, **after}).fetchall()
+    rows = set_next_cursor(response, rows, limit, lambda r: (r[6], r[0]))
     return [
         {
             "id": r[0], "agent_id": r[1], "model": r[2], "device": r[3],
@@ -373,53 +507,131 @@ def list_qa_logs(limit: int = 50, db: Session = Depends(get_db)):
         for r in rows
     ]
 
+async def log_qa(payload: dict, result: dict, cache_hit: bool = False):
+    """Hand the qa_logs row to the write-behind sink; never on the request's latency path"""
+    await qa_log_sink.submit(
+        qa_log_sink.row("mock-inference", payload, result, model="mock", device="cpu", cache_hit=cache_hit)
+    )
+
+def scan_ndjson(lines, tokens: int, final):
+    """Count token events and pick out the closing {"done": true} event"""
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if event.get("done"):
+            final = event
+        else:
+            tokens += 1
+    return tokens, final
+
+async def qa_stream(payload: dict):
+    """Relay the NDJSON token stream as it arrives; log one qa_logs row when it ends"""
+    started = time.perf_counter()
+    client = http_clients.get("inference")
+    upstream = None
+    try:
+        request = client.build_request("POST", "/infer", json=payload, timeout=httpx.Timeout(60, read=None))
+        upstream = await client.send(request, stream=True)
+        upstream.raise_for_status()
+    except Exception as e:
+        if upstream is not None:
+            await upstream.aclose()
+        raise HTTPException(status_code=503, detail=f"Inference error: {str(e)}")
+
+    async def relay():
+        ttft_ms, tokens, final, tail = None, 0, None, b""
+        try:
+            async for chunk in upstream.aiter_bytes():
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+                yield chunk
+                *lines, tail = (tail + chunk).split(b"\n")
+                tokens, final = scan_ndjson(lines, tokens, final)
+            tokens, final = scan_ndjson([tail], tokens, final)
+        finally:
+            await upstream.aclose()
+            result = {
+                **(final or {"done": False}),
+                "stream": {"tokens": tokens, "ttft_ms": ttft_ms, "total_ms": round((time.perf_counter() - started) * 1000, 1)}
+            }
+            try:
+                await log_qa(payload, result)
+            except Exception as e:
+                logger.warning(f"⚠️  Could not log streamed QA: {e}")
+
+    return StreamingResponse(relay(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
+async def infer(payload: dict) -> dict:
+    try:
+        response = await http_clients.get("inference").post("/infer", json=payload)
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Inference error: {str(e)}")
+
 # QA proxy - existing
 @app.post("/qa")
-async def qa_proxy(payload: dict, db: Session = Depends(get_db)):
-    inference_url = os.getenv("AI_SERVICE_HOST", "ai-inference")
-    inference_port = os.getenv("AI_SERVICE_PORT", "8001")
+async def qa_proxy(payload: dict, response: Response):
+    """Identical payloads for the same harvested model are answered from the result cache ("cache": false skips it)"""
+    if payload.get("stream"):
+        return await qa_stream(payload)
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        try:
-            response = await client.post(
-                f"http://{inference_url}:{inference_port}/infer",
-                json=payload
-            )
-            response.raise_for_status()
-            result = response.json()
-        except Exception as e:
-            raise HTTPException(status_code=503, detail=f"Inference error: {str(e)}")
-
-    log_query = text("""
-        INSERT INTO app.qa_logs (id, agent_id, model, device, request_json, response_json, created_at)
-        VALUES (:id, :agent_id, :model, :device, CAST(:request AS jsonb), CAST(:response AS jsonb), NOW())
-    """)
+    result, cache_hit = await qa_result_cache.get_or_compute(payload, lambda: infer(payload))
+    response.headers["X-Cache"] = "HIT" if cache_hit else "MISS"
 
-    db.execute(log_query, {
-        "id": str(uuid4()),
-        "agent_id": "mock-inference",
-        "model": "mock",
-        "device": "cpu",
-        "request": json.dumps(payload),
-        "response": json.dumps(result)
-    })
-    db.commit()
+    await log_qa(payload, result, cache_hit=cache_hit)
 
     return {"agent": "mock-inference", "data": result}
 
 
-@app.post("/tests/run")
-def run_tests(db: Session = Depends(get_db)):
-    """Queue test execution (stub implementation)"""
-    query = text("""
-        SELECT id, name, description 
-        FROM app.test_cases 
-        WHERE COALESCE(status, '') != 'passed'
-        LIMIT 20
+# TEST CASES LIST - new
+@app.get("/tests")
+def list_tests(response: Response, status: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None,
+               db: Session = Depends(get_db)):
+    """List test cases newest first; keyset-paginated via `cursor` / X-Next-Cursor"""
+    after = keyset_after(cursor, id_type=int, nullable_created_at=True)
+    filters = []
+    if status:
+        filters.append("status = :status")
+    # created_at is nullable here; undated rows come first (NULLS FIRST, as the DESC index stores them)
+    if after and after["after_created_at"] is None:
+        filters.append("(created_at IS NOT NULL OR id < CAST(:after_id AS integer))")
+    elif after:
+        filters.append("(created_at, id) < (:after_created_at, CAST(:after_id AS integer))")
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    query = text(f"""
+        SELECT id, name, description, status, passed, created_at, updated_at
+        FROM app.test_cases
+        {where}
+        ORDER BY created_at DESC NULLS FIRST, id DESC
+        LIMIT :limit
     """)
-    rows = db.execute(query).fetchall()
-    return {
-        "status": "queued",
-        "test_count": len(rows),
-        "tests": [{"id": r[0], "name": r[1], "description": r[2]} for r in rows]
-    }
+    rows = db.execute(query, {"status": status, "limit": limit + 1, **after}).fetchall()
+    rows = set_next_cursor(response, rows, limit, lambda r: (r[5], r[0]))
+    return [
+        {"id": r[0], "name": r[1], "description": r[2], "status": r[3], "passed": r[4],
+         "created_at": r[5], "updated_at": r[6]}
+        for r in rows
+    ]
+
+class TestRunRequest(BaseModel):
+    test_case_ids: Optional[list[int]] = None
+    only_unpassed: bool = True
+
+@app.post("/tests/run", status_code=202)
+async def run_tests(body: Optional[TestRunRequest] = None, db: AsyncSession = Depends(get_async_db)):
+    """Queue a test run (default: every test case not yet passed); poll GET /tests/runs/{run_id}"""
+    body = body or TestRunRequest()
+    run = await create_run(db, body.test_case_ids, body.only_unpassed)
+    await db.commit()
+    return {"status": "queued", "run_id": run["run_id"], "test_count": run["total"]}
+
+@app.get("/tests/runs/{run_id}")
+async def get_test_run(run_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """Run progress: counters, completion ratio and item counts by status"""
+    progress = await run_progress(db, str(run_id))
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Test run not found")
+    return progress
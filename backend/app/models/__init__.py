@@ -1,5 +1,7 @@
 from .test import TestCase
+from .test_run import TestRun, TestRunItem
 from .sankalpa import Sankalpa
 from .qa_logs import QALog
+from .campaign import CampaignLineage, CampaignIteration
 
-__all__ = ["TestCase", "Sankalpa", "QALog"]
+__all__ = ["TestCase", "TestRun", "TestRunItem", "Sankalpa", "QALog", "CampaignLineage", "CampaignIteration"]
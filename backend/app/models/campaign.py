@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, SmallInteger, Text, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class CampaignLineage(Base):
+    """A marketing campaign; the JSONB columns hold a small summary of its latest recorded run"""
+    __tablename__ = "campaign_lineage"
+    __table_args__ = {"schema": "app"}
+
+    campaign_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    brand_sankalpa = Column(Text, nullable=False)
+    copy_iterations = Column(JSONB, server_default="{}")
+    trust_score_evolution = Column(JSONB, server_default="{}")
+    consciousness_impact = Column(Text)
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class CampaignIteration(Base):
+    """One recorded marketing QA run (append-only); per-URL statuses as a delta or a keyframe snapshot"""
+    __tablename__ = "campaign_iterations"
+    __table_args__ = (
+        Index("ix_campaign_iterations_campaign_run_at", "campaign_id", "run_at", postgresql_include=["trust_score"]),
+        {"schema": "app"},
+    )
+
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey("app.campaign_lineage.campaign_id", ondelete="CASCADE"),
+                         primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    run_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    trust_score = Column(SmallInteger, nullable=False)
+    score_delta = Column(SmallInteger)
+    urls = Column(Integer, nullable=False, default=0, server_default="0")
+    checks = Column(Integer, nullable=False, default=0, server_default="0")
+    by_check = Column(JSONB, nullable=False, default=dict, server_default="{}")
+    snapshot = Column(JSONB)  # {url: {check: status}} every CAMPAIGN_KEYFRAME_EVERY runs
+    delta = Column(JSONB)     # {"set": {url: {check: status}}, "removed": [url]} vs the previous run
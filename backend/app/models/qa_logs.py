@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 import uuid
@@ -7,7 +7,12 @@ from ..core.database import Base
 
 class QALog(Base):
     __tablename__ = "qa_logs"
-    __table_args__ = {"schema": "app"}
+    __table_args__ = (
+        # keyset pagination: ORDER BY created_at DESC, id DESC
+        Index("ix_qa_logs_created_at_id", text("created_at DESC"), text("id DESC")),
+        # partitioned by month (see app.services.qa_log_partitions); the PK must include the partition key
+        {"schema": "app", "postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     agent_id = Column(String(100))
@@ -15,4 +20,5 @@ class QALog(Base):
     device = Column(String(50))
     request_json = Column(JSONB)
     response_json = Column(JSONB)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    cache_hit = Column(Boolean, nullable=False, default=False, server_default=text("false"))
+    created_at = Column(DateTime(timezone=True), primary_key=True, nullable=False, server_default=func.now())
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Text, DateTime, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Computed, Index, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.sql import func
 import uuid
 from ..core.database import Base
@@ -10,7 +10,13 @@ class Sankalpa(Base):
     Sankalpa (intention/resolve) model for storing spiritual commitments and intentions.
     """
     __tablename__ = "sankalpa"
-    __table_args__ = {"schema": "app"}
+    __table_args__ = (
+        Index("ix_sankalpa_search_tsv", "search_tsv", postgresql_using="gin"),
+        Index("ix_sankalpa_text_trgm", "text", postgresql_using="gin", postgresql_ops={"text": "gin_trgm_ops"}),
+        # keyset pagination: ORDER BY created_at DESC, id DESC
+        Index("ix_sankalpa_created_at_id", text("created_at DESC"), text("id DESC")),
+        {"schema": "app"},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     text = Column(Text, nullable=False)
@@ -22,5 +28,12 @@ class Sankalpa(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
     
+    # Maintained by Postgres; text weighted above context for ranking
+    search_tsv = Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple'::regconfig, coalesce(text, '')), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(context, '')), 'B')",
+        persisted=True,
+    ))
+    
     def __repr__(self):
         return f"<Sankalpa(id={self.id}, text='{self.text[:30] if len(self.text) > 30 else self.text}', status='{self.status}')>"
@@ -1,15 +1,20 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index, text
 from sqlalchemy.sql import func
 from ..core.database import Base
 
 
 class TestCase(Base):
     __tablename__ = "test_cases"
-    __table_args__ = {"schema": "app"}
+    __table_args__ = (
+        # keyset pagination: ORDER BY created_at DESC, id DESC
+        Index("ix_test_cases_created_at_id", text("created_at DESC"), text("id DESC")),
+        {"schema": "app"},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     description = Column(String)
+    expected_output = Column(String)  # the answer must contain it (case-insensitive); none -> 'unverified'
     status = Column(String, default="pending")
     passed = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Identity, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+import uuid
+from ..core.database import Base
+
+
+class TestRun(Base):
+    """One POST /tests/run; counters are advanced by the workers' batched result writes"""
+    __tablename__ = "test_runs"
+    __table_args__ = {"schema": "app"}
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(String(20), nullable=False, default="queued", server_default="queued")  # queued|running|completed
+    total = Column(Integer, nullable=False, default=0, server_default="0")
+    completed = Column(Integer, nullable=False, default=0, server_default="0")
+    passed = Column(Integer, nullable=False, default=0, server_default="0")
+    failed = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+
+class TestRunItem(Base):
+    """Queue entry: one test case within a run, claimed with FOR UPDATE SKIP LOCKED"""
+    __tablename__ = "test_run_items"
+    __table_args__ = (
+        Index("ix_test_run_items_queued", "id", postgresql_where=text("status = 'queued'")),
+        Index("ix_test_run_items_running", "locked_at", postgresql_where=text("status = 'running'")),
+        Index("ix_test_run_items_run_status", "run_id", "status"),
+        {"schema": "app"},
+    )
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    run_id = Column(UUID(as_uuid=True), ForeignKey("app.test_runs.id", ondelete="CASCADE"), nullable=False)
+    test_case_id = Column(Integer, ForeignKey("app.test_cases.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String(20), nullable=False, default="queued", server_default="queued")  # queued|running|passed|failed|unverified|error
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    locked_by = Column(String(100))
+    locked_at = Column(DateTime(timezone=True))
+    result = Column(JSONB)
+    duration_ms = Column(Integer)
+    finished_at = Column(DateTime(timezone=True))
@@ -0,0 +1,181 @@
+"""
+Partition maintenance for the range-partitioned app.qa_logs table.
+
+    python -m app.services.qa_log_partitions                 # create ahead + expire
+    python -m app.services.qa_log_partitions --dry-run
+    python -m app.services.qa_log_partitions --interval day --ahead 14 --retention 90
+    python -m app.services.qa_log_partitions --archive-dir /backups/qa_logs
+
+Partitions are named qa_logs_pYYYYMM (month) or qa_logs_pYYYYMMDD (day) and
+cover [start, next start) in UTC. Run it from cron / a k8s CronJob at least
+once per interval; `--ahead` partitions are always kept ready so inserts
+never fall through to the default partition.
+"""
+import argparse
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import text
+
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+PARENT = "qa_logs"
+SCHEMA = "app"
+PARTITION_NAME = re.compile(rf"^{PARENT}_p(\d{{6}}|\d{{8}})$")
+
+
+def period_start(day: date, interval: str) -> date:
+    return day.replace(day=1) if interval == "month" else day
+
+
+def next_start(start: date, interval: str) -> date:
+    if interval == "day":
+        return start + timedelta(days=1)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(start: date, interval: str) -> str:
+    return f"{PARENT}_p{start:%Y%m}" if interval == "month" else f"{PARENT}_p{start:%Y%m%d}"
+
+
+def parse_partition(name: str):
+    """(start, end) covered by a partition created by this module, else None"""
+    match = PARTITION_NAME.match(name)
+    if not match:
+        return None
+    digits = match.group(1)
+    if len(digits) == 6:
+        start = date(int(digits[:4]), int(digits[4:]), 1)
+        return start, next_start(start, "month")
+    start = date(int(digits[:4]), int(digits[4:6]), int(digits[6:]))
+    return start, next_start(start, "day")
+
+
+def list_partitions(conn) -> list:
+    rows = conn.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        JOIN pg_namespace n ON n.oid = p.relnamespace
+        WHERE n.nspname = :schema AND p.relname = :parent
+        ORDER BY c.relname
+    """), {"schema": SCHEMA, "parent": PARENT}).fetchall()
+    return [r[0] for r in rows]
+
+
+def create_partition(conn, start: date, interval: str, dry_run: bool = False) -> bool:
+    """
+    Create the partition for [start, next start). Rows that already landed in
+    the default partition for that range are moved into it first, otherwise
+    Postgres refuses the new partition. A range already covered by existing
+    partitions (e.g. a day inside a monthly partition after switching
+    --interval) is skipped; one that only partly overlaps is skipped with a
+    warning, since ATTACH would fail.
+    """
+    name = partition_name(start, interval)
+    end = next_start(start, interval)
+    ranges = [bounds for bounds in map(parse_partition, list_partitions(conn)) if bounds]
+    overlapping = [(s, e) for s, e in ranges if s < end and start < e]
+    if overlapping:
+        covered = sum((min(e, end) - max(s, start)).days for s, e in overlapping)
+        if covered < (end - start).days:
+            logger.warning(f"⚠️  {SCHEMA}.{name} [{start}, {end}) partly overlaps existing partitions "
+                           f"{', '.join(f'[{s}, {e})' for s, e in overlapping)}; skipped, the rest of the range stays in {PARENT}_default")
+        return False
+    logger.info(f"➕ {SCHEMA}.{name} [{start}, {end})")
+    if dry_run:
+        return True
+    # explicit offsets: a bare date would be read in the session TimeZone, not UTC
+    bounds = {"start": f"{start.isoformat()} 00:00:00+00", "end": f"{end.isoformat()} 00:00:00+00"}
+    # one transaction: create, move, attach
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.{name} (LIKE {SCHEMA}.{PARENT} INCLUDING DEFAULTS)"))
+    moved = conn.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {SCHEMA}.{PARENT}_default
+            WHERE created_at >= CAST(:start AS timestamptz) AND created_at < CAST(:end AS timestamptz)
+            RETURNING *
+        )
+        INSERT INTO {SCHEMA}.{name} SELECT * FROM moved
+    """), bounds).rowcount
+    conn.execute(text(f"""
+        ALTER TABLE {SCHEMA}.{PARENT} ATTACH PARTITION {SCHEMA}.{name}
+        FOR VALUES FROM ('{bounds["start"]}') TO ('{bounds["end"]}')
+    """))
+    conn.commit()
+    if moved:
+        logger.info(f"   moved {moved} rows out of {PARENT}_default")
+    return True
+
+
+def ensure_partitions(conn, interval: str = "month", ahead: int = 3, today: date = None,
+                      dry_run: bool = False) -> list:
+    """Current period plus `ahead` future periods"""
+    start = period_start(today or datetime.now(timezone.utc).date(), interval)
+    created = []
+    for _ in range(ahead + 1):
+        if create_partition(conn, start, interval, dry_run):
+            created.append(partition_name(start, interval))
+        start = next_start(start, interval)
+    return created
+
+
+def archive_partition(conn, name: str, archive_dir: str) -> str:
+    """COPY a detached partition to a gzipped CSV (with header) before it is dropped"""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    cursor = conn.connection.cursor()
+    with gzip.open(path, "wt") as f:
+        cursor.copy_expert(f"COPY {SCHEMA}.{name} TO STDOUT WITH (FORMAT csv, HEADER)", f)
+    cursor.close()
+    return path
+
+
+def expire_partitions(conn, retention_days: int, archive_dir: str = None, today: date = None,
+                      dry_run: bool = False) -> list:
+    """Detach, optionally archive, and drop partitions whose whole range is older than the retention"""
+    cutoff = (today or datetime.now(timezone.utc).date()) - timedelta(days=retention_days)
+    expired = []
+    for name in list_partitions(conn):
+        bounds = parse_partition(name)
+        if bounds is None or bounds[1] > cutoff:
+            continue
+        logger.info(f"➖ {SCHEMA}.{name} [{bounds[0]}, {bounds[1]}) older than {cutoff}")
+        expired.append(name)
+        if dry_run:
+            continue
+        conn.execute(text(f"ALTER TABLE {SCHEMA}.{PARENT} DETACH PARTITION {SCHEMA}.{name}"))
+        conn.commit()
+        if archive_dir:
+            path = archive_partition(conn, name, archive_dir)
+            logger.info(f"   archived to {path}")
+        conn.execute(text(f"DROP TABLE {SCHEMA}.{name}"))
+        conn.commit()
+    return expired
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create upcoming and expire old app.qa_logs partitions")
+    parser.add_argument("--interval", choices=["month", "day"], default=os.getenv("QA_LOG_PARTITION_INTERVAL", "month"))
+    parser.add_argument("--ahead", type=int, default=int(os.getenv("QA_LOG_PARTITIONS_AHEAD", "3")),
+                        help="future partitions to keep ready")
+    parser.add_argument("--retention", type=int, default=int(os.getenv("QA_LOG_RETENTION_DAYS", "180")),
+                        help="days of qa_logs to keep; 0 disables expiry")
+    parser.add_argument("--archive-dir", default=os.getenv("QA_LOG_ARCHIVE_DIR"),
+                        help="write expired partitions here as csv.gz before dropping")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with engine.connect() as conn:
+        created = ensure_partitions(conn, args.interval, args.ahead, dry_run=args.dry_run)
+        expired = expire_partitions(conn, args.retention, args.archive_dir, dry_run=args.dry_run) if args.retention else []
+    logger.info(f"✅ {len(created)} partitions created, {len(expired)} expired")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, DataError, IntegrityError, StatementError
+
+from app.core.database import AsyncSessionLocal
+from app.models.qa_logs import QALog
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("id", "agent_id", "model", "device", "request_json", "response_json", "cache_hit", "created_at")
+
+
+class QALogSink:
+    """
+    Write-behind sink for app.qa_logs.
+
+    Callers enqueue rows and return immediately; a background task flushes
+    them as one multi-row INSERT when `batch_size` rows are waiting or
+    `flush_interval` seconds have passed. When the bounded queue is full the
+    `overflow` policy applies: "block" awaits a free slot (backpressure),
+    "spill" appends the row to an NDJSON file that is replayed on the next
+    start. Rows from a flush that failed because the database was unreachable
+    are spilled too. A batch rejected for its data (e.g. a \\u0000 in jsonb) is
+    bisected so the good rows still land; rows that fail alone go to the
+    dead-letter file and are never retried. stop() drains the queue.
+    """
+
+    def __init__(self, max_queue: int = 10000, batch_size: int = 500, flush_interval: float = 0.5,
+                 overflow: str = "block", spill_path: str = "/tmp/qa_logs.spill.ndjson",
+                 dead_letter_path: str = None):
+        if overflow not in ("block", "spill"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.dead_letter_path = dead_letter_path or f"{spill_path}.dead"
+        self._queue = None
+        self._task = None
+        self._loop = None
+        self.stats = {"enqueued": 0, "flushed": 0, "batches": 0, "spilled": 0, "replayed": 0,
+                      "flush_errors": 0, "dead_lettered": 0, "last_flush_ms": None}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_queue=int(os.getenv("QA_LOG_QUEUE_SIZE", "10000")),
+            batch_size=int(os.getenv("QA_LOG_BATCH_SIZE", "500")),
+            flush_interval=float(os.getenv("QA_LOG_FLUSH_INTERVAL", "0.5")),
+            overflow=os.getenv("QA_LOG_OVERFLOW", "block"),
+            spill_path=os.getenv("QA_LOG_SPILL_PATH", "/tmp/qa_logs.spill.ndjson"),
+            dead_letter_path=os.getenv("QA_LOG_DEAD_LETTER_PATH"),
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        await self._replay_spill()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued, then stop the writer"""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @staticmethod
+    def row(agent_id: str, request: dict, response: dict, model: str = None, device: str = None,
+            id: str = None, cache_hit: bool = False) -> dict:
+        """created_at is taken now, so rows keep event time rather than flush time"""
+        return {
+            "id": uuid.UUID(str(id)) if id else uuid.uuid4(),
+            "agent_id": agent_id,
+            "model": model,
+            "device": device,
+            "request_json": request,
+            "response_json": response,
+            "cache_hit": cache_hit,
+            "created_at": datetime.now(timezone.utc),
+        }
+
+    async def submit(self, row: dict):
+        self.stats["enqueued"] += 1
+        if self._queue is None:
+            # not started (scripts, one-off tools): write through
+            await self._flush([row])
+            return
+        if self.overflow == "spill" and self._queue.full():
+            await asyncio.to_thread(self._spill, [row])
+            return
+        await self._queue.put(row)
+
+    def submit_threadsafe(self, row: dict):
+        """For sync routes running in the threadpool; blocks only under backpressure"""
+        asyncio.run_coroutine_threadsafe(self.submit(row), self._loop).result()
+
+    def metrics(self) -> dict:
+        return {**self.stats, "queued": self._queue.qsize() if self._queue else 0,
+                "max_queue": self.max_queue, "overflow": self.overflow}
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, rows: list):
+        start = time.perf_counter()
+        await self._write(rows)
+        self.stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    async def _insert(self, rows: list):
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(QALog.__table__).values(rows))
+            await db.commit()
+        self.stats["flushed"] += len(rows)
+        self.stats["batches"] += 1
+
+    @staticmethod
+    def _is_row_error(e: Exception) -> bool:
+        """The rows were rejected (bad data), as opposed to the database being unavailable"""
+        return isinstance(e, (DataError, IntegrityError)) or (
+            isinstance(e, StatementError) and not isinstance(e, DBAPIError))  # failed to encode client-side
+
+    async def _write(self, rows: list):
+        try:
+            await self._insert(rows)
+        except Exception as e:
+            if not self._is_row_error(e):
+                self.stats["flush_errors"] += 1
+                logger.warning(f"⚠️  qa_logs flush of {len(rows)} rows failed, spilling to disk: {e}")
+                await asyncio.to_thread(self._spill, rows)
+            elif len(rows) == 1:
+                logger.warning(f"⚠️  qa_logs row {rows[0].get('id')} rejected, dead-lettered: {e}")
+                await asyncio.to_thread(self._dead_letter, rows[0], e)
+            else:
+                # bisect: a bad row costs log2(batch) extra INSERTs, and only it is set aside
+                mid = len(rows) // 2
+                await self._write(rows[:mid])
+                await self._write(rows[mid:])
+
+    def _spill(self, rows: list):
+        with open(self.spill_path, "a") as f:
+            for row in rows:
+                f.write(json.dumps({k: row.get(k) for k in COLUMNS}, default=str) + "\n")
+        self.stats["spilled"] += len(rows)
+
+    def _dead_letter(self, row: dict, error: Exception):
+        with open(self.dead_letter_path, "a") as f:
+            record = {k: row.get(k) for k in COLUMNS}
+            record["error"] = str(getattr(error, "orig", error))[:500]
+            f.write(json.dumps(record, default=str) + "\n")
+        self.stats["dead_lettered"] += 1
+
+    async def _replay_spill(self):
+        if not os.path.exists(self.spill_path):
+            return
+        replay_path = f"{self.spill_path}.{int(time.time())}.replay"
+        os.replace(self.spill_path, replay_path)
+        with open(replay_path) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        for row in rows:
+            row["id"] = uuid.UUID(row["id"])
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+            row["cache_hit"] = bool(row.get("cache_hit"))
+        for i in range(0, len(rows), self.batch_size):
+            await self._flush(rows[i:i + self.batch_size])
+        self.stats["replayed"] += len(rows)
+        os.remove(replay_path)
+        logger.info(f"✅ Replayed {len(rows)} spilled qa_logs rows")
+
+
+qa_log_sink = QALogSink.from_env()
@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from app.core.redis import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# VCV fields that identify what computes an answer; harvest timestamps etc. are ignored
+MODEL_IDENTITY_FIELDS = ("schema_version", "model_path", "device", "supported_formats", "max_tokens",
+                         "inputs", "outputs")
+# payload keys that do not change the answer
+NON_SEMANTIC_KEYS = ("stream", "cache")
+
+
+def canonical_json(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def model_fingerprint(vcv: dict) -> str:
+    identity = {field: vcv.get(field) for field in MODEL_IDENTITY_FIELDS}
+    return hashlib.sha256(canonical_json(identity).encode()).hexdigest()[:16]
+
+
+def payload_key(payload: dict) -> str:
+    semantic = {k: v for k, v in payload.items() if k not in NON_SEMANTIC_KEYS}
+    return hashlib.sha256(canonical_json(semantic).encode()).hexdigest()
+
+
+class _LRU:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class QAResultCache:
+    """
+    Content-addressed cache of /qa inference results.
+
+    Key = sha256 of the canonical payload, namespaced by the fingerprint of
+    the harvested VCV's model identity: {prefix}{fingerprint}:{hash}. An
+    in-process LRU sits in front of Valkey. Identical concurrent misses share
+    one upstream call. Harvesting a different model/device switches the
+    namespace and purges the previous generation from both tiers; with no
+    harvested VCV the cache is bypassed, since answers cannot be attributed
+    to a model.
+    """
+
+    def __init__(self, prefix: str = "qa:", ttl: int = 86400, lru_size: int = 1024, lru_ttl: float = 300.0,
+                 retry_after: float = 5.0, enabled: bool = True):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.enabled = enabled
+        self.fingerprint = None
+        self._lru = _LRU(lru_size, lru_ttl)
+        self._client = None
+        self._down_until = 0.0
+        self._inflight = {}
+        self.stats = {"lru_hits": 0, "valkey_hits": 0, "misses": 0, "coalesced": 0, "stores": 0,
+                      "errors": 0, "purged_generations": 0, "purged_keys": 0}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            prefix=os.getenv("QA_CACHE_PREFIX", "qa:"),
+            ttl=int(os.getenv("QA_CACHE_TTL", "86400")),
+            lru_size=int(os.getenv("QA_CACHE_LRU_SIZE", "1024")),
+            lru_ttl=float(os.getenv("QA_CACHE_LRU_TTL", "300")),
+            enabled=os.getenv("QA_CACHE_ENABLED", "1") == "1",
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_async_redis(socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._client
+
+    @property
+    def active(self) -> bool:
+        return self.enabled and self.fingerprint is not None
+
+    async def set_model(self, vcv: dict):
+        """Called on every harvest; a changed identity invalidates every cached answer"""
+        fingerprint = model_fingerprint(vcv)
+        previous = self.fingerprint
+        self.fingerprint = fingerprint
+        if previous != fingerprint:
+            self._lru.clear()
+        if not self.enabled or not self._valkey_up():
+            return
+        try:
+            # shared across workers and restarts, so one harvest purges what any worker cached
+            stored = await self.client.getset(f"{self.prefix}model", fingerprint)
+        except Exception as e:
+            self._failed(e)
+            return
+        for old in {previous, stored} - {None, fingerprint}:
+            logger.info(f"♻️  Model identity changed ({old} → {fingerprint}), purging cached /qa results")
+            asyncio.create_task(self._purge(old))
+
+    async def get_or_compute(self, payload: dict, compute):
+        """(result, hit); `compute` is the upstream call, awaited only on a miss"""
+        if not self.active or payload.get("cache") is False:
+            return await compute(), False
+        key = f"{self.prefix}{self.fingerprint}:{payload_key(payload)}"
+
+        value = self._lru.get(key)
+        if value is not None:
+            self.stats["lru_hits"] += 1
+            return value, True
+        value = await self._valkey_get(key)
+        if value is not None:
+            self.stats["valkey_hits"] += 1
+            self._lru.put(key, value)
+            return value, True
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight), True
+
+        self.stats["misses"] += 1
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await compute()
+            future.set_result(value)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self._lru.put(key, value)
+        await self._valkey_set(key, value)
+        return value, False
+
+    def metrics(self) -> dict:
+        hits = self.stats["lru_hits"] + self.stats["valkey_hits"] + self.stats["coalesced"]
+        lookups = hits + self.stats["misses"]
+        return {**self.stats, "enabled": self.enabled, "model_fingerprint": self.fingerprint,
+                "lru_entries": len(self._lru), "hit_ratio": round(hits / lookups, 3) if lookups else None}
+
+    async def _valkey_get(self, key: str):
+        if not self._valkey_up():
+            return None
+        try:
+            raw = await self.client.get(key)
+        except Exception as e:
+            self._failed(e)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def _valkey_set(self, key: str, value):
+        if not self._valkey_up():
+            return
+        try:
+            await self.client.set(key, canonical_json(value), ex=self.ttl)
+            self.stats["stores"] += 1
+        except Exception as e:
+            self._failed(e)
+
+    async def _purge(self, fingerprint: str):
+        deleted = 0
+        try:
+            batch = []
+            async for key in self.client.scan_iter(match=f"{self.prefix}{fingerprint}:*", count=1000):
+                batch.append(key)
+                if len(batch) >= 1000:
+                    deleted += await self.client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.client.unlink(*batch)
+        except Exception as e:
+            self._failed(e)
+        self.stats["purged_generations"] += 1
+        self.stats["purged_keys"] += deleted
+
+    def _valkey_up(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _failed(self, error: Exception):
+        self.stats["errors"] += 1
+        if self._valkey_up():
+            logger.warning(f"⚠️  Valkey unavailable, /qa cache using in-process tier only for {self.retry_after}s: {error}")
+        self._down_until = time.monotonic() + self.retry_after
+
+
+qa_result_cache = QAResultCache.from_env()
@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import zlib
+from fastapi.encoders import jsonable_encoder
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# first byte of every cached value: raw JSON or zlib-compressed JSON
+RAW, ZLIB = b"j", b"z"
+
+# delete the lock only if we still own it
+RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end
+return 0
+"""
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ReadThroughCache:
+    """
+    Read-through cache on Valkey for sync read routes.
+
+    get_or_load() returns the cached JSON-ready value or calls `loader`,
+    caches its result for the namespace TTL and returns it. Concurrent misses
+    for one key are collapsed twice: threads in this process wait on a single
+    in-flight load, and processes race for a short SET NX lock so only one
+    of them queries Postgres while the rest poll for the value. Loader
+    results of None (not found) are not cached. If Valkey is unreachable the
+    cache steps aside for `retry_after` seconds and reads go straight to the
+    loader.
+    """
+
+    def __init__(self, prefix: str = "sqa:", ttls: dict = None, lock_ttl: float = 5.0,
+                 poll_interval: float = 0.02, compress_min_bytes: int = 1024,
+                 retry_after: float = 5.0, enabled: bool = True):
+        self.prefix = prefix
+        self.ttls = ttls or {}
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self.compress_min_bytes = compress_min_bytes
+        self.retry_after = retry_after
+        self.enabled = enabled
+        self._client = None
+        self._release = None
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.stats = {}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            prefix=os.getenv("CACHE_PREFIX", "sqa:"),
+            ttls={
+                "sankalpa": int(os.getenv("CACHE_SANKALPA_TTL", "300")),
+                "lineage": int(os.getenv("CACHE_LINEAGE_TTL", "86400")),
+            },
+            lock_ttl=float(os.getenv("CACHE_LOCK_TTL", "5")),
+            compress_min_bytes=int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024")),
+            enabled=os.getenv("CACHE_ENABLED", "1") == "1",
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_redis(decode_responses=False, socket_timeout=0.5, socket_connect_timeout=0.5)
+            self._release = self._client.register_script(RELEASE_LOCK)
+        return self._client
+
+    def get_or_load(self, namespace: str, key: str, loader):
+        if not self._available():
+            return self._encode_value(loader())
+        full_key = f"{self.prefix}{namespace}:{key}"
+        cached = self._get(namespace, full_key)
+        if cached is not None:
+            self._count(namespace, "hits")
+            return cached
+        self._count(namespace, "misses")
+        if not self._available():
+            return self._encode_value(loader())
+
+        with self._lock:
+            flight = self._flights.get(full_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[full_key] = _Flight()
+        if not leader:
+            self._count(namespace, "coalesced")
+            if flight.done.wait(self.lock_ttl):
+                if flight.error:
+                    raise flight.error
+                return flight.value
+            return self._encode_value(loader())
+
+        try:
+            flight.value = self._load(namespace, full_key, loader)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            flight.done.set()
+            with self._lock:
+                self._flights.pop(full_key, None)
+
+    def invalidate(self, namespace: str, *keys):
+        if not keys or not self._available():
+            return
+        try:
+            self.client.delete(*(f"{self.prefix}{namespace}:{key}" for key in keys))
+            self._count(namespace, "invalidations", len(keys))
+        except Exception as e:
+            self._failed(namespace, e)
+
+    def metrics(self) -> dict:
+        out = {"enabled": self.enabled, "available": self._available()}
+        for namespace, counts in self.stats.items():
+            lookups = counts.get("hits", 0) + counts.get("misses", 0)
+            out[namespace] = {**counts, "hit_ratio": round(counts.get("hits", 0) / lookups, 3) if lookups else None}
+        return out
+
+    def _load(self, namespace: str, full_key: str, loader):
+        """Cross-process single flight: the SET NX winner loads, the others poll for its result"""
+        token = uuid.uuid4().hex
+        lock_key = f"{full_key}:lock"
+        try:
+            owner = self.client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            self._failed(namespace, e)
+            return self._encode_value(loader())
+
+        if not owner:
+            self._count(namespace, "lock_waits")
+            deadline = time.monotonic() + self.lock_ttl
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                cached = self._get(namespace, full_key)
+                if cached is not None:
+                    return cached
+                if not self._available():
+                    break
+
+        try:
+            self._count(namespace, "loads")
+            value = self._encode_value(loader())
+            if value is not None:
+                self._set(namespace, full_key, value)
+            return value
+        finally:
+            if owner:
+                try:
+                    self._release(keys=[lock_key], args=[token])
+                except Exception as e:
+                    self._failed(namespace, e)
+
+    def _get(self, namespace: str, full_key: str):
+        try:
+            raw = self.client.get(full_key)
+        except Exception as e:
+            self._failed(namespace, e)
+            return None
+        if raw is None:
+            return None
+        body = zlib.decompress(raw[1:]) if raw[:1] == ZLIB else raw[1:]
+        return json.loads(body)
+
+    def _set(self, namespace: str, full_key: str, value):
+        body = json.dumps(value, separators=(",", ":")).encode()
+        payload = ZLIB + zlib.compress(body) if len(body) >= self.compress_min_bytes else RAW + body
+        try:
+            self.client.set(full_key, payload, ex=self.ttls.get(namespace, 300))
+        except Exception as e:
+            self._failed(namespace, e)
+
+    @staticmethod
+    def _encode_value(value):
+        """Same JSON-ready shape on hit and miss (UUIDs, datetimes as strings)"""
+        return None if value is None else jsonable_encoder(value)
+
+    def _available(self) -> bool:
+        return self.enabled and time.monotonic() >= self._down_until
+
+    def _failed(self, namespace: str, error: Exception):
+        self._count(namespace, "errors")
+        if time.monotonic() >= self._down_until:
+            logger.warning(f"⚠️  Valkey unavailable, bypassing read cache for {self.retry_after}s: {error}")
+        self._down_until = time.monotonic() + self.retry_after
+
+    def _count(self, namespace: str, name: str, n: int = 1):
+        counts = self.stats.setdefault(namespace, {})
+        counts[name] = counts.get(name, 0) + n
+
+
+read_cache = ReadThroughCache.from_env()
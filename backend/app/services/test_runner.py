@@ -0,0 +1,358 @@
+"""
+Test execution engine: workers drain app.test_run_items, a Postgres queue
+claimed with FOR UPDATE SKIP LOCKED, so any number of worker processes can
+shard one run without double-executing an item.
+
+    python -m app.services.test_runner --concurrency 32        # standalone worker
+    TEST_RUNNER_EMBEDDED=1 (default)                           # one worker inside the backend
+
+A test case is executed by sending its description (or name) as the prompt
+to the inference service's /infer within TEST_RUNNER_TIMEOUT seconds. It
+passes when the answer is ok and its text contains the case's
+expected_output (case-insensitive). A case without expected_output cannot
+be judged: it finishes as 'unverified', counted neither passed nor failed.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import time
+import uuid
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal
+from app.core.http import http_clients, register_inference
+
+logger = logging.getLogger(__name__)
+
+CREATE_RUN_QUERY = text("""
+    WITH run AS (
+        INSERT INTO app.test_runs (id, status, total, finished_at)
+        -- nothing matched (e.g. every case already passed): born completed, no worker will ever touch it
+        SELECT CAST(:run_id AS uuid), CASE WHEN count(*) = 0 THEN 'completed' ELSE 'queued' END, count(*),
+               CASE WHEN count(*) = 0 THEN NOW() END
+        FROM app.test_cases tc
+        WHERE (CAST(:ids AS integer[]) IS NULL OR tc.id = ANY(CAST(:ids AS integer[])))
+          AND (:only_unpassed = false OR COALESCE(tc.status, '') != 'passed')
+        RETURNING id, total
+    ),
+    items AS (
+        INSERT INTO app.test_run_items (run_id, test_case_id)
+        SELECT CAST(:run_id AS uuid), tc.id FROM app.test_cases tc
+        WHERE (CAST(:ids AS integer[]) IS NULL OR tc.id = ANY(CAST(:ids AS integer[])))
+          AND (:only_unpassed = false OR COALESCE(tc.status, '') != 'passed')
+        ORDER BY tc.id
+    )
+    SELECT id, total FROM run
+""")
+
+CLAIM_QUERY = text("""
+    WITH claimed AS (
+        UPDATE app.test_run_items i
+        SET status = 'running', locked_by = :worker, locked_at = NOW(), attempts = i.attempts + 1
+        WHERE i.id IN (
+            SELECT id FROM app.test_run_items
+            WHERE status = 'queued'
+            ORDER BY id
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING i.id, i.run_id, i.test_case_id, i.attempts
+    ),
+    started AS (
+        UPDATE app.test_runs r SET status = 'running', started_at = NOW()
+        WHERE r.id IN (SELECT run_id FROM claimed) AND r.status = 'queued'
+    )
+    SELECT c.id, c.run_id, c.test_case_id, c.attempts, tc.name, tc.description, tc.expected_output
+    FROM claimed c JOIN app.test_cases tc ON tc.id = c.test_case_id
+""")
+
+# One statement per batch of results: items, test_cases.status/passed and run counters
+WRITE_RESULTS_QUERY = text("""
+    WITH r AS (
+        SELECT * FROM jsonb_to_recordset(CAST(:results AS jsonb)) AS r(
+            id bigint, run_id uuid, test_case_id int, status text, passed boolean, result jsonb, duration_ms int
+        )
+    ),
+    items AS (
+        UPDATE app.test_run_items i
+        SET status = r.status, result = r.result, duration_ms = r.duration_ms, finished_at = NOW()
+        FROM r WHERE i.id = r.id AND i.status = 'running'
+        RETURNING i.run_id, i.test_case_id, r.status, r.passed
+    ),
+    cases AS (
+        UPDATE app.test_cases tc
+        SET status = CASE WHEN items.passed THEN 'passed' WHEN items.status = 'unverified' THEN 'unverified'
+                          ELSE 'failed' END,
+            passed = items.passed, updated_at = NOW()
+        FROM items WHERE tc.id = items.test_case_id
+    ),
+    counts AS (
+        SELECT run_id, count(*) AS done, count(*) FILTER (WHERE passed) AS ok,
+               count(*) FILTER (WHERE NOT passed AND status != 'unverified') AS bad
+        FROM items GROUP BY run_id
+    )
+    UPDATE app.test_runs t
+    SET completed = t.completed + counts.done,
+        passed = t.passed + counts.ok,
+        failed = t.failed + counts.bad,
+        status = CASE WHEN t.completed + counts.done >= t.total THEN 'completed' ELSE t.status END,
+        finished_at = CASE WHEN t.completed + counts.done >= t.total THEN NOW() ELSE t.finished_at END
+    FROM counts WHERE t.id = counts.run_id
+""")
+
+# Items whose worker died: back to the queue, or errored out after max_attempts
+REQUEUE_EXPIRED_QUERY = text("""
+    UPDATE app.test_run_items
+    SET status = 'queued', locked_by = NULL, locked_at = NULL
+    WHERE status = 'running' AND locked_at < NOW() - make_interval(secs => :lease) AND attempts < :max_attempts
+""")
+EXHAUSTED_QUERY = text("""
+    SELECT id, run_id, test_case_id, attempts FROM app.test_run_items
+    WHERE status = 'running' AND locked_at < NOW() - make_interval(secs => :lease) AND attempts >= :max_attempts
+    LIMIT 1000
+""")
+
+RUN_PROGRESS_QUERY = text("""
+    SELECT r.id, r.status, r.total, r.completed, r.passed, r.failed, r.created_at, r.started_at, r.finished_at,
+           (SELECT COALESCE(jsonb_object_agg(status, n), '{}'::jsonb)
+            FROM (SELECT status, count(*) AS n FROM app.test_run_items WHERE run_id = r.id GROUP BY status) s)
+    FROM app.test_runs r WHERE r.id = :run_id
+""")
+
+
+async def create_run(db, test_case_ids: list = None, only_unpassed: bool = True) -> dict:
+    """Enqueue a run in one statement; the caller commits"""
+    row = (await db.execute(CREATE_RUN_QUERY, {
+        "run_id": str(uuid.uuid4()),
+        "ids": test_case_ids,
+        "only_unpassed": only_unpassed,
+    })).fetchone()
+    return {"run_id": str(row[0]), "total": row[1]}
+
+
+async def run_progress(db, run_id: str):
+    row = (await db.execute(RUN_PROGRESS_QUERY, {"run_id": run_id})).fetchone()
+    if row is None:
+        return None
+    return {
+        "run_id": str(row[0]), "status": row[1], "total": row[2], "completed": row[3],
+        "passed": row[4], "failed": row[5], "unverified": row[3] - row[4] - row[5],
+        "progress": round(row[3] / row[2], 4) if row[2] else 1.0,
+        "created_at": row[6], "started_at": row[7], "finished_at": row[8],
+        "items": row[9],
+    }
+
+
+def judge(case: dict, answer) -> tuple:
+    """(passed, status) for an /infer answer: passed, failed or unverified"""
+    if not isinstance(answer, dict) or not answer.get("ok"):
+        return False, "failed"
+    expected = (case.get("expected_output") or "").strip()
+    if not expected:
+        return False, "unverified"
+    passed = expected.lower() in str(answer.get("text") or "").lower()
+    return passed, "passed" if passed else "failed"
+
+
+async def execute_test_case(case: dict, timeout: float) -> dict:
+    """Default executor; returns {"passed", "status", "result"}"""
+    prompt = case["description"] or case["name"]
+    try:
+        response = await http_clients.get("inference").post(
+            "/infer", json={"prompt": prompt, "test_case_id": case["test_case_id"]}, timeout=timeout
+        )
+        response.raise_for_status()
+        answer = response.json()
+    except Exception as e:
+        return {"passed": False, "status": "error", "result": {"error": f"{type(e).__name__}: {e}"}}
+    passed, status = judge(case, answer)
+    return {"passed": passed, "status": status, "result": {"response": answer}}
+
+
+class TestRunner:
+    """
+    One worker: claims up to `concurrency` items at a time, runs them with at
+    most `concurrency` in flight, and writes results back `batch_size` at a
+    time (or every `flush_interval` seconds). Items left running longer than
+    `lease` seconds by a dead worker are requeued by any live worker, up to
+    `max_attempts`, then recorded as errors.
+    """
+
+    def __init__(self, concurrency: int = 8, batch_size: int = 50, flush_interval: float = 1.0,
+                 poll_interval: float = 1.0, lease: float = 300.0, max_attempts: int = 3,
+                 timeout: float = 30.0, executor=execute_test_case, worker_id: str = None):
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.executor = executor
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._results = []
+        self._in_flight = set()
+        self._stopping = asyncio.Event()
+        self._task = None
+        self._last_flush = time.monotonic()
+        self._last_reap = 0.0
+        self._errors_in_a_row = 0
+        self.stats = {"claimed": 0, "passed": 0, "failed": 0, "unverified": 0, "errors": 0, "flushes": 0, "requeued": 0}
+
+    @classmethod
+    def from_env(cls, **overrides):
+        options = {
+            "concurrency": int(os.getenv("TEST_RUNNER_CONCURRENCY", "8")),
+            "batch_size": int(os.getenv("TEST_RUNNER_BATCH_SIZE", "50")),
+            "flush_interval": float(os.getenv("TEST_RUNNER_FLUSH_INTERVAL", "1.0")),
+            "poll_interval": float(os.getenv("TEST_RUNNER_POLL_INTERVAL", "1.0")),
+            "lease": float(os.getenv("TEST_RUNNER_LEASE", "300")),
+            "max_attempts": int(os.getenv("TEST_RUNNER_MAX_ATTEMPTS", "3")),
+            "timeout": float(os.getenv("TEST_RUNNER_TIMEOUT", "30")),
+        }
+        options.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**options)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.running:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop claiming, let in-flight tests finish, write their results"""
+        self._stopping.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+    def metrics(self) -> dict:
+        return {**self.stats, "worker_id": self.worker_id, "in_flight": len(self._in_flight),
+                "pending_results": len(self._results), "concurrency": self.concurrency}
+
+    async def run(self):
+        logger.info(f"🧪 Test runner {self.worker_id} started (concurrency={self.concurrency})")
+        while not self._stopping.is_set():
+            try:
+                await self._reap_expired()
+                free = self.concurrency - len(self._in_flight)
+                claimed = await self._claim(free) if free > 0 else []
+                for case in claimed:
+                    task = asyncio.create_task(self._execute(case))
+                    self._in_flight.add(task)
+                    task.add_done_callback(self._in_flight.discard)
+                if self._results and (len(self._results) >= self.batch_size
+                                      or time.monotonic() - self._last_flush >= self.flush_interval):
+                    await self._flush()
+                self._errors_in_a_row = 0
+                if not claimed:
+                    await self._idle()
+            except Exception as e:
+                self._errors_in_a_row += 1
+                if self._errors_in_a_row == 1:
+                    logger.warning(f"⚠️  Test runner loop error, backing off: {e}")
+                await self._idle(min(self.poll_interval * 2 ** self._errors_in_a_row, 30))
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        await self._flush()
+        logger.info(f"🧪 Test runner {self.worker_id} stopped")
+
+    async def _idle(self, timeout: float = None):
+        """Sleep until the poll interval passes, a slot frees up, or stop() is called"""
+        waiters = [asyncio.create_task(self._stopping.wait())]
+        if self._in_flight:
+            waiters.append(asyncio.create_task(asyncio.wait(set(self._in_flight), return_when=asyncio.FIRST_COMPLETED)))
+        done, pending = await asyncio.wait(waiters, timeout=timeout or self.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+
+    async def _claim(self, limit: int) -> list:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(CLAIM_QUERY, {"worker": self.worker_id, "limit": limit})).fetchall()
+            await db.commit()
+        self.stats["claimed"] += len(rows)
+        return [
+            {"id": r[0], "run_id": str(r[1]), "test_case_id": r[2], "attempts": r[3], "name": r[4],
+             "description": r[5], "expected_output": r[6]}
+            for r in rows
+        ]
+
+    async def _execute(self, case: dict):
+        start = time.perf_counter()
+        try:
+            outcome = await self.executor(case, self.timeout)
+        except Exception as e:
+            outcome = {"passed": False, "status": "error", "result": {"error": f"{type(e).__name__}: {e}"}}
+        self.stats["passed" if outcome["passed"] else {"error": "errors", "unverified": "unverified"}.get(
+            outcome["status"], "failed")] += 1
+        self._results.append({
+            "id": case["id"], "run_id": case["run_id"], "test_case_id": case["test_case_id"],
+            "status": outcome["status"], "passed": outcome["passed"], "result": outcome.get("result"),
+            "duration_ms": int((time.perf_counter() - start) * 1000),
+        })
+
+    async def _flush(self):
+        self._last_flush = time.monotonic()
+        if not self._results:
+            return
+        batch, self._results = self._results, []
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(WRITE_RESULTS_QUERY, {"results": json.dumps(batch, default=str)})
+                await db.commit()
+            self.stats["flushes"] += 1
+        except Exception as e:
+            # keep them for the next flush; the lease reaper covers a worker that never gets there
+            logger.warning(f"⚠️  Could not write {len(batch)} test results: {e}")
+            self._results = batch + self._results
+
+    async def _reap_expired(self):
+        if time.monotonic() - self._last_reap < min(self.lease, 60):
+            return
+        self._last_reap = time.monotonic()
+        params = {"lease": self.lease, "max_attempts": self.max_attempts}
+        async with AsyncSessionLocal() as db:
+            requeued = (await db.execute(REQUEUE_EXPIRED_QUERY, params)).rowcount
+            exhausted = (await db.execute(EXHAUSTED_QUERY, params)).fetchall()
+            await db.commit()
+        self.stats["requeued"] += requeued
+        for r in exhausted:
+            self._results.append({
+                "id": r[0], "run_id": str(r[1]), "test_case_id": r[2], "status": "error", "passed": False,
+                "result": {"error": f"lease expired after {r[3]} attempts"}, "duration_ms": None,
+            })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued test cases from app.test_run_items")
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--timeout", type=float)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    register_inference()
+
+    async def serve():
+        runner = TestRunner.from_env(concurrency=args.concurrency, batch_size=args.batch_size, timeout=args.timeout)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, runner._stopping.set)
+        await http_clients.open()
+        try:
+            await runner.run()
+        finally:
+            await http_clients.aclose()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tokens/sec of the legacy concatenate-and-rerun loop vs services/kv_decoder.py.
+
+    python scripts/bench_kv_decoding.py --model models/qwen/model.onnx --tokenizer Qwen/Qwen2.5-7B-Instruct
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services"))
+from model_registry import ModelRegistry
+from kv_decoder import GreedyDecoder
+
+
+def legacy_loop(session, input_ids, attn, n):
+    """The original run_cpu_inference.predict loop, minus its 64-token cap"""
+    generated_ids = []
+    for _ in range(n):
+        outputs = session.run(None, {"input_ids": input_ids, "attention_mask": attn})
+        next_token = int(np.argmax(outputs[0][:, -1, :], axis=-1))
+        generated_ids.append(next_token)
+        input_ids = np.concatenate([input_ids, [[next_token]]], axis=1)
+        attn = np.concatenate([attn, [[1]]], axis=1)
+    return generated_ids
+
+
+def engine_loop(decoder, input_ids, attn, n):
+    # eos disabled so both loops produce exactly n tokens
+    return [int(t[0]) for t, _ in decoder.generate(input_ids, attn, n, eos_token_id=None)]
+
+
+def timed(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.getenv("MODEL_PATH", "models/qwen/model.onnx"))
+    parser.add_argument("--tokenizer", default=os.getenv("TOKENIZER_ID", "Qwen/Qwen2.5-7B-Instruct"))
+    parser.add_argument("--prompt", default="Explain what a sankalpa is in one paragraph.")
+    parser.add_argument("--lengths", default="16,64,256")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.model, args.tokenizer)
+    session, tok = registry.load()
+    decoder = GreedyDecoder(session)
+    enc = tok(args.prompt, return_tensors="np")
+    ids = enc["input_ids"].astype(np.int64)
+    attn = enc["attention_mask"].astype(np.int64)
+    print(f"model loaded in {registry.load_time_ms}ms, kv cache: {decoder.uses_cache}, prompt tokens: {ids.shape[1]}")
+
+    engine_loop(decoder, ids, attn, 2)  # warm-up
+    print(f"{'tokens':>7} {'legacy tok/s':>13} {'engine tok/s':>13} {'speedup':>8}")
+    for n in [int(x) for x in args.lengths.split(",")]:
+        legacy = timed(lambda: legacy_loop(session, ids, attn, n), args.repeats)
+        engine = timed(lambda: engine_loop(decoder, ids, attn, n), args.repeats)
+        print(f"{n:>7} {n / legacy:>13.1f} {n / engine:>13.1f} {legacy / engine:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Concurrent /qa load test - latency percentiles and throughput.
+
+Run it against the build before and after a change and compare the tables:
+
+    python scripts/load_qa.py --url http://localhost:8000 --concurrency 200 --requests 4000
+"""
+import argparse
+import asyncio
+import time
+import httpx
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+async def run(url: str, concurrency: int, total: int, payload: dict):
+    latencies, errors = [], 0
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        async def worker():
+            nonlocal errors
+            for i in remaining:
+                start = time.perf_counter()
+                try:
+                    r = await client.post("/qa", json={**payload, "n": i})
+                    r.raise_for_status()
+                    latencies.append((time.perf_counter() - start) * 1000)
+                except Exception:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"requests={total} concurrency={concurrency} errors={errors} elapsed={elapsed:.2f}s rps={len(latencies) / elapsed:.1f}")
+    for pct in (50, 90, 95, 99):
+        print(f"  p{pct:<3} {percentile(latencies, pct):8.1f} ms")
+    print(f"  max  {latencies[-1] if latencies else 0:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--prompt", default="load test")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.requests, {"prompt": args.prompt}))
+
+
+if __name__ == "__main__":
+    main()
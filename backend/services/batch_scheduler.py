@@ -0,0 +1,147 @@
+import asyncio
+import bisect
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_DONE = object()
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus-style cumulative `le` buckets)"""
+
+    def __init__(self, bounds):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        buckets, running = {}, 0
+        for bound, count in zip(self.bounds + ["+Inf"], self.counts):
+            running += count
+            buckets[str(bound)] = running
+        return {"count": self.total, "sum": round(self.sum, 3), "buckets": buckets}
+
+
+class PendingRequest:
+    def __init__(self, prompt: str, max_new_tokens: int):
+        self.prompt = prompt
+        self.max_new_tokens = max_new_tokens
+        self.enqueued_at = time.perf_counter()
+        self.tokens = asyncio.Queue()
+
+    async def __aiter__(self):
+        while True:
+            item = await self.tokens.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+class BatchScheduler:
+    """
+    Dynamic micro-batching in front of a GreedyDecoder.
+
+    Prompts that arrive within `window_ms` of the first queued one (up to
+    `max_batch_size`) are left-padded into one tensor and decoded together,
+    one forward pass per step for the whole batch. Each row's tokens are pushed
+    to its own caller as they are produced; rows finish independently.
+    """
+
+    def __init__(self, get_engine, window_ms: float = 10, max_batch_size: int = 8):
+        self.get_engine = get_engine
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64])
+        self.queue_wait_ms = Histogram([1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000])
+        self._queue = None
+        self._task = None
+        self._executor = None
+
+    def start(self):
+        if self._task is None:
+            # per start: stop() shuts the pool down for good. One decode loop at a time
+            # keeps ORT's own thread pool uncontended
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="decode")
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def submit(self, prompt: str, max_new_tokens: int) -> PendingRequest:
+        """Queue a prompt; iterate the result (`async for`) to receive token ids"""
+        self.start()
+        req = PendingRequest(prompt, max_new_tokens)
+        self._queue.put_nowait(req)
+        return req
+
+    async def generate(self, prompt: str, max_new_tokens: int) -> list:
+        return [tok async for tok in self.submit(prompt, max_new_tokens)]
+
+    def metrics(self) -> dict:
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            started = time.perf_counter()
+            self.batch_sizes.observe(len(batch))
+            for req in batch:
+                self.queue_wait_ms.observe((started - req.enqueued_at) * 1000)
+            await loop.run_in_executor(self._executor, self._decode_batch, batch, loop)
+
+    def _decode_batch(self, batch, loop):
+        def emit(req, item):
+            loop.call_soon_threadsafe(req.tokens.put_nowait, item)
+
+        try:
+            decoder, tok = self.get_engine()
+            if tok.pad_token_id is None:
+                tok.pad_token = tok.eos_token
+            tok.padding_side = "left"
+            enc = tok([req.prompt for req in batch], padding=True, return_tensors="np")
+            limits = [req.max_new_tokens for req in batch]
+            for tokens, emitted in decoder.generate(enc["input_ids"], enc["attention_mask"], limits, tok.eos_token_id):
+                for row, req in enumerate(batch):
+                    if emitted[row]:
+                        emit(req, int(tokens[row]))
+        except Exception as e:
+            for req in batch:
+                emit(req, e)
+        finally:
+            for req in batch:
+                emit(req, _DONE)
@@ -0,0 +1,125 @@
+import numpy as np
+
+ORT_DTYPES = {
+    "tensor(float)": np.float32,
+    "tensor(float16)": np.float16,
+    "tensor(double)": np.float64,
+}
+
+
+class GreedyDecoder:
+    """
+    Greedy decoding over a causal-LM ONNX graph.
+
+    When the graph exports `past_key_values.*` inputs with matching `present.*`
+    outputs, only the newest token is fed each step and the presents are handed
+    straight back as the next past (no copies), so a step no longer re-runs the
+    whole sequence. Graphs without a KV cache fall back to full-sequence steps.
+    Either way ids, attention mask and position ids live in buffers allocated
+    once per call instead of being rebuilt with np.concatenate every step.
+
+    Works on batches: prompts must be left-padded, and rows may stop at
+    different lengths (eos or their own max_new_tokens).
+    """
+
+    def __init__(self, session):
+        self.session = session
+        inputs = {i.name: i for i in session.get_inputs()}
+        outputs = [o.name for o in session.get_outputs()]
+        self.has_position_ids = "position_ids" in inputs
+        self.past_inputs = [i for name, i in inputs.items() if name.startswith("past_key_values")]
+        self.present_names = [i.name.replace("past_key_values", "present", 1) for i in self.past_inputs]
+        self.logits_name = "logits" if "logits" in outputs else outputs[0]
+        self.uses_cache = bool(self.past_inputs) and all(n in outputs for n in self.present_names)
+        self._past_layout = [self._empty_past_layout(i) for i in self.past_inputs] if self.uses_cache else []
+        if self.uses_cache and any(layout is None for layout in self._past_layout):
+            # dynamic head/dim axes: cannot build the empty prefill cache
+            self.uses_cache = False
+
+    @staticmethod
+    def _empty_past_layout(node_arg):
+        """(heads, head_dim, dtype) for a [batch, heads, past_len, head_dim] input"""
+        shape = node_arg.shape
+        if len(shape) != 4 or not isinstance(shape[1], int) or not isinstance(shape[3], int):
+            return None
+        return shape[1], shape[3], ORT_DTYPES.get(node_arg.type, np.float32)
+
+    def generate(self, input_ids, attention_mask, max_new_tokens, eos_token_id=None):
+        """
+        Yields (tokens, emitted) per step: tokens is the [batch] array of new
+        ids and emitted flags rows that were still generating at that step.
+        max_new_tokens is an int or a per-row sequence.
+        """
+        input_ids = np.asarray(input_ids, dtype=np.int64)
+        attention_mask = np.asarray(attention_mask, dtype=np.int64)
+        batch, prompt_len = input_ids.shape
+        limits = np.broadcast_to(np.asarray(max_new_tokens, dtype=np.int64), (batch,))
+        steps = int(limits.max()) if batch else 0
+        if steps <= 0:
+            return
+        eos = set(np.atleast_1d(eos_token_id).tolist()) if eos_token_id is not None else set()
+
+        total = prompt_len + steps
+        mask = np.ones((batch, total), dtype=np.int64)
+        mask[:, :prompt_len] = attention_mask
+        active = np.ones(batch, dtype=bool)
+        produced = np.zeros(batch, dtype=np.int64)
+
+        if self.uses_cache:
+            step_fn = self._cached_steps(input_ids, mask, prompt_len, steps)
+        else:
+            step_fn = self._full_steps(input_ids, mask, prompt_len, steps)
+
+        next_tokens = None
+        for _ in range(steps):
+            logits = step_fn.send(next_tokens) if next_tokens is not None else next(step_fn)
+            next_tokens = np.argmax(logits[:, -1, :], axis=-1).astype(np.int64)
+            emitted = active.copy()
+            yield next_tokens, emitted
+            produced += emitted
+            if eos:
+                active &= ~np.isin(next_tokens, list(eos))
+            active &= produced < limits
+            if not active.any():
+                break
+        step_fn.close()
+
+    def _cached_steps(self, input_ids, mask, prompt_len, steps):
+        batch = input_ids.shape[0]
+        feed = {"input_ids": input_ids, "attention_mask": mask[:, :prompt_len]}
+        for node_arg, (heads, head_dim, dtype) in zip(self.past_inputs, self._past_layout):
+            feed[node_arg.name] = np.zeros((batch, heads, 0, head_dim), dtype=dtype)
+        if self.has_position_ids:
+            positions = np.maximum(np.cumsum(mask[:, :prompt_len], axis=-1) - 1, 0)
+            feed["position_ids"] = positions
+            last_pos = positions[:, -1:].copy()
+        step_ids = np.empty((batch, 1), dtype=np.int64)
+        output_names = [self.logits_name] + self.present_names
+
+        cur = prompt_len
+        while True:
+            outputs = self.session.run(output_names, feed)
+            next_tokens = yield outputs[0]
+            for node_arg, present in zip(self.past_inputs, outputs[1:]):
+                feed[node_arg.name] = present
+            step_ids[:, 0] = next_tokens
+            cur += 1
+            feed["input_ids"] = step_ids
+            feed["attention_mask"] = mask[:, :cur]
+            if self.has_position_ids:
+                last_pos += 1
+                feed["position_ids"] = last_pos
+
+    def _full_steps(self, input_ids, mask, prompt_len, steps):
+        batch = input_ids.shape[0]
+        ids = np.zeros((batch, prompt_len + steps), dtype=np.int64)
+        ids[:, :prompt_len] = input_ids
+        positions = np.maximum(np.cumsum(mask, axis=-1) - 1, 0) if self.has_position_ids else None
+        cur = prompt_len
+        while True:
+            feed = {"input_ids": ids[:, :cur], "attention_mask": mask[:, :cur]}
+            if positions is not None:
+                feed["position_ids"] = positions[:, :cur]
+            next_tokens = yield self.session.run([self.logits_name], feed)[0]
+            ids[:, cur] = next_tokens
+            cur += 1
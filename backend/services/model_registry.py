@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+import resource
+import onnxruntime as ort
+try:
+    from transformers import AutoTokenizer
+except Exception:
+    AutoTokenizer = None
+
+GRAPH_OPT_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+def build_session_options() -> ort.SessionOptions:
+    """SessionOptions from ORT_* env vars (0 threads = let ORT decide)"""
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = int(os.getenv("ORT_INTRA_OP_THREADS", "0"))
+    opts.inter_op_num_threads = int(os.getenv("ORT_INTER_OP_THREADS", "0"))
+    opts.graph_optimization_level = GRAPH_OPT_LEVELS[os.getenv("ORT_GRAPH_OPT_LEVEL", "all").lower()]
+    opts.enable_cpu_mem_arena = os.getenv("ORT_ENABLE_MEM_ARENA", "1") == "1"
+    opts.enable_mem_pattern = os.getenv("ORT_ENABLE_MEM_PATTERN", "1") == "1"
+    if os.getenv("ORT_PARALLEL_EXECUTION", "0") == "1":
+        opts.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+    return opts
+
+
+def resident_memory_mb() -> float:
+    """Current RSS of this process; falls back to peak RSS off Linux"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+    except Exception:
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class ModelRegistry:
+    """Loads the ONNX session + tokenizer once and keeps them warm for every request"""
+
+    def __init__(self, model_path: str, tokenizer_id: str):
+        self.model_path = model_path
+        self.tokenizer_id = tokenizer_id
+        self.session = None
+        self.tokenizer = None
+        self.load_time_ms = None
+        self.loaded_at = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return AutoTokenizer is not None
+
+    @property
+    def loaded(self) -> bool:
+        return self.session is not None and self.tokenizer is not None
+
+    def load(self):
+        """Idempotent; concurrent first calls block on the same load"""
+        if self.loaded:
+            return self.session, self.tokenizer
+        with self._lock:
+            if not self.loaded:
+                start = time.perf_counter()
+                try:
+                    tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_id, use_fast=True)
+                    session = ort.InferenceSession(
+                        self.model_path,
+                        sess_options=build_session_options(),
+                        providers=["CPUExecutionProvider"],
+                    )
+                except Exception as e:
+                    self.error = str(e)
+                    raise
+                self.tokenizer, self.session = tokenizer, session
+                self.load_time_ms = round((time.perf_counter() - start) * 1000, 1)
+                self.loaded_at = time.time()
+                self.error = None
+        return self.session, self.tokenizer
+
+    def stats(self) -> dict:
+        return {
+            "model_path": self.model_path,
+            "tokenizer_id": self.tokenizer_id,
+            "warm": self.loaded,
+            "load_time_ms": self.load_time_ms,
+            "uptime_s": round(time.time() - self.loaded_at, 1) if self.loaded_at else None,
+            "rss_mb": resident_memory_mb(),
+            "load_error": self.error,
+        }
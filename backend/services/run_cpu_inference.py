@@ -1,48 +1,131 @@
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import onnxruntime as ort
-import numpy as np
-try:
-    from transformers import AutoTokenizer
-except Exception:
-    AutoTokenizer = None
+import asyncio
+import logging
+import json
+import os
+
+from model_registry import ModelRegistry
+from kv_decoder import GreedyDecoder
+from batch_scheduler import BatchScheduler
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
-MODEL_PATH = "models/qwen/model.onnx"
-TOKENIZER_ID = "Qwen/Qwen2.5-7B-Instruct"
+MODEL_PATH = os.getenv("MODEL_PATH", "models/qwen/model.onnx")
+TOKENIZER_ID = os.getenv("TOKENIZER_ID", "Qwen/Qwen2.5-7B-Instruct")
+MAX_NEW_TOKENS = int(os.getenv("MAX_NEW_TOKENS", "64"))
+
+registry = ModelRegistry(MODEL_PATH, TOKENIZER_ID)
+_decoder = None
+
+def get_engine():
+    """Warm session/tokenizer plus a decoder bound to that session"""
+    global _decoder
+    session, tok = registry.load()
+    if _decoder is None or _decoder.session is not session:
+        _decoder = GreedyDecoder(session)
+    return _decoder, tok
+
+scheduler = BatchScheduler(
+    get_engine,
+    window_ms=float(os.getenv("BATCH_WINDOW_MS", "10")),
+    max_batch_size=int(os.getenv("MAX_BATCH_SIZE", "8")),
+)
 
 class PredictionRequest(BaseModel):
     prompt: str
     max_new_tokens: int = 64
+    stream: bool = False
+
+@app.on_event("startup")
+def warm_model():
+    """Load at startup unless MODEL_PRELOAD=0 (then the first /predict pays it)"""
+    if not registry.available or os.getenv("MODEL_PRELOAD", "1") != "1":
+        return
+    try:
+        registry.load()
+        logger.info(f"model warm in {registry.load_time_ms}ms")
+    except Exception as e:
+        logger.warning(f"model preload failed, will retry on first request: {e}")
+
+@app.on_event("startup")
+async def start_scheduler():
+    scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_scheduler():
+    await scheduler.stop()
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "provider": "CPUExecutionProvider"}
+    stats = registry.stats()
+    stats["kv_cache"] = _decoder.uses_cache if _decoder else None
+    return {"status": "ok", "provider": "CPUExecutionProvider", "model": stats}
+
+@app.get("/metrics")
+def metrics():
+    return {"scheduler": scheduler.metrics()}
+
+async def load_tokenizer():
+    """A cold registry.load() takes seconds (tokenizer + ONNX session): run it off the event loop"""
+    if registry.loaded:
+        return registry.tokenizer
+    _, tok = await asyncio.get_running_loop().run_in_executor(None, registry.load)
+    return tok
+
+async def generate_text(prompt: str, max_new_tokens: int) -> str:
+    generated_ids = await scheduler.generate(prompt, min(MAX_NEW_TOKENS, max_new_tokens))
+    tok = await load_tokenizer()
+    return tok.decode(generated_ids, skip_special_tokens=True)
+
+async def stream_text(prompt: str, max_new_tokens: int, final: dict):
+    """NDJSON: one {"token"} line per decoded piece, then {"done": true, **final, "text"}"""
+    generated_ids, emitted = [], ""
+    try:
+        # inside the try: a failed load is reported as the error line, not a broken stream
+        tok = await load_tokenizer()
+        async for token_id in scheduler.submit(prompt, min(MAX_NEW_TOKENS, max_new_tokens)):
+            generated_ids.append(token_id)
+            text = tok.decode(generated_ids, skip_special_tokens=True)
+            # hold back partial multi-byte characters until the next token completes them
+            if text.endswith("\ufffd") or len(text) <= len(emitted):
+                continue
+            piece, emitted = text[len(emitted):], text
+            yield json.dumps({"token": piece}) + "\n"
+        yield json.dumps({"done": True, **final, "text": tok.decode(generated_ids, skip_special_tokens=True)}) + "\n"
+    except Exception as e:
+        yield json.dumps({"done": True, "error": str(e)}) + "\n"
+
+def ndjson_response(lines) -> StreamingResponse:
+    return StreamingResponse(lines, media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
 
 @app.post("/predict")
-def predict(req: PredictionRequest):
+async def predict(req: PredictionRequest):
     # Minimal safe echo if tokenizer/model absent
-    if AutoTokenizer is None:
+    if not registry.available:
         return {"text": f"[cpu-echo] {req.prompt[:200]}"}
+    if req.stream:
+        return ndjson_response(stream_text(req.prompt, req.max_new_tokens, {}))
+    try:
+        return {"text": await generate_text(req.prompt, req.max_new_tokens)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/infer")
+async def infer(req: Request):
+    # Same contract as inference/server.py so the backend /qa proxy can point here
+    body = await req.json()
+    if not registry.available:
+        return {"ok": True, "echo": body}
+    prompt, max_new_tokens = str(body.get("prompt", "")), int(body.get("max_new_tokens", 64))
+    if body.get("stream"):
+        return ndjson_response(stream_text(prompt, max_new_tokens, {"ok": True}))
     try:
-        tok = AutoTokenizer.from_pretrained(TOKENIZER_ID, use_fast=True)
-        session = ort.InferenceSession(MODEL_PATH, providers=["CPUExecutionProvider"])
-        enc = tok(req.prompt, return_tensors="np")
-        input_ids = enc["input_ids"].astype(np.int64)
-        attn = enc["attention_mask"].astype(np.int64)
-        # NOTE: This is a placeholder loop; real models require proper logits handling
-        generated_ids = []
-        for _ in range(min(64, req.max_new_tokens)):
-            outputs = session.run(None, {"input_ids": input_ids, "attention_mask": attn})
-            logits = outputs[0]
-            next_token = int(np.argmax(logits[:, -1, :], axis=-1))
-            generated_ids.append(next_token)
-            input_ids = np.concatenate([input_ids, [[next_token]]], axis=1)
-            attn = np.concatenate([attn, [[1]]], axis=1)
-        text = tok.decode(generated_ids, skip_special_tokens=True)
-        return {"text": text}
+        return {"ok": True, "text": await generate_text(prompt, max_new_tokens)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
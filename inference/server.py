@@ -1,6 +1,9 @@
 from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime, timezone
+import asyncio
+import json
 import uvicorn
 
 app = FastAPI()
@@ -8,6 +11,7 @@ app = FastAPI()
 class PredictionRequest(BaseModel):
     prompt: str
     max_new_tokens: int = 16
+    stream: bool = False
 
 @app.get("/health")
 def health():
@@ -27,15 +31,30 @@ def vcv():
         "outputs": []
     }
 
+async def echo_stream(text: str, final: dict):
+    # NDJSON token stream: {"token": ...} per word, then {"done": true, ...final}
+    for i, word in enumerate(text.split(" ")):
+        yield json.dumps({"token": word if i == 0 else f" {word}"}) + "\n"
+        await asyncio.sleep(0)
+    yield json.dumps({"done": True, **final}) + "\n"
+
+def ndjson_response(lines) -> StreamingResponse:
+    return StreamingResponse(lines, media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
 @app.post("/predict")
 def predict(req: PredictionRequest):
     # Placeholder - replace with real model later
-    return {"text": f"ECHO: {req.prompt[:100]}..."}
+    text = f"ECHO: {req.prompt[:100]}..."
+    if req.stream:
+        return ndjson_response(echo_stream(text, {"text": text}))
+    return {"text": text}
 
 @app.post("/infer")
 async def infer(req: Request):
     # Generic inference endpoint for QA tests
     body = await req.json()
+    if body.get("stream"):
+        return ndjson_response(echo_stream(str(body.get("prompt", "")), {"ok": True, "echo": body}))
     return {"ok": True, "echo": body}
 
 if __name__ == "__main__":